@@ -0,0 +1,21 @@
+# ssg_blocklist.py - Playwright 요청 차단 목록과 route 핸들러 (세 스크레이퍼 공용)
+
+# DOM 텍스트만 파싱하므로 렌더링용 리소스는 요청 단계에서 차단
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+# 트래커/광고 호스트 (URL 부분 문자열 매칭)
+BLOCKED_URL_PARTS = ("google-analytics", "googletagmanager", "doubleclick", "criteo", "facebook", "hotjar")
+
+
+def make_route_blocker(blocked_types=BLOCKED_RESOURCE_TYPES):
+    """blocked_types 리소스와 트래커 요청은 abort, 나머지는 통과시키는 route 핸들러 생성"""
+    async def _block(route):
+        request = route.request
+        if request.resource_type in blocked_types or any(part in request.url for part in BLOCKED_URL_PARTS):
+            await route.abort()
+        else:
+            await route.continue_()
+    return _block
+
+
+# 기본 차단 목록을 쓰는 핸들러 (context.route("**/*", block_heavy_resources))
+block_heavy_resources = make_route_blocker()
@@ -0,0 +1,83 @@
+# ssg_brands.py - 제목에서 브랜드/제품명 분리 (analyzer, hybrid scraper 공용)
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+# Aho-Corasick 브랜드 매칭 (없으면 정규식 폴백)
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+KNOWN_BRANDS = [
+    "다이슨", "Dyson", "필립스", "Philips", "파나소닉", "Panasonic",
+    "샤오미", "Xiaomi", "LG", "삼성", "Samsung", "테팔", "브라운", "Braun",
+    "글램팜", "보다나", "유닉스", "살롱드프로", "모즈", "아이디어",
+    "레틴", "바이레텍", "코멘", "클레오"
+]
+
+
+@lru_cache(maxsize=8)
+def _brand_automaton(brands: tuple):
+    """브랜드 목록 → Aho-Corasick 오토마톤 (소문자 키, 값은 (키 길이, 원래 브랜드))"""
+    automaton = ahocorasick.Automaton()
+    for brand in brands:
+        key = brand.lower()
+        automaton.add_word(key, (len(key), brand))
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=8)
+def _brand_regex(brands: tuple):
+    """모든 브랜드를 한 번에 찾는 정규식 (긴 이름 우선, 한글 붙여쓰기도 잡도록 \\b 없이) + 소문자 → 원래 브랜드"""
+    pattern = re.compile('|'.join(re.escape(b) for b in sorted(brands, key=len, reverse=True)), re.IGNORECASE)
+    return pattern, {b.lower(): b for b in brands}
+
+
+def find_brand(text: str, brands: Iterable[str] = KNOWN_BRANDS) -> Optional[Tuple[int, int, str]]:
+    """가장 앞에 나오는 브랜드 (같은 위치면 긴 이름 우선) → (start, end, brand)"""
+
+    brands = tuple(brands)
+    if not brands:
+        return None
+
+    if HAS_AHOCORASICK:
+        best = None
+        for end_index, (length, brand) in _brand_automaton(brands).iter(text.lower()):
+            start = end_index - length + 1
+            if best is None or start < best[0] or (start == best[0] and length > best[1] - best[0]):
+                best = (start, end_index + 1, brand)
+        return best
+
+    pattern, lookup = _brand_regex(brands)
+    match = pattern.search(text)
+    if match:
+        return match.start(), match.end(), lookup[match.group().lower()]
+    return None
+
+
+def is_word_boundary(text: str, start: int, end: int) -> bool:
+    """text[start:end] 앞뒤가 단어 문자가 아닌지 (정규식 \\b와 동일한 기준)"""
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return not (before.isalnum() or before == '_') and not (after.isalnum() or after == '_')
+
+
+def split_brand_and_name(full_title: str, brands: Iterable[str] = KNOWN_BRANDS) -> Tuple[str, str]:
+    """제목 → (브랜드, 제품명). 브랜드가 없으면 첫 단어를 브랜드로 간주"""
+
+    span = find_brand(full_title, brands)
+
+    if span:
+        start, end, found_brand = span
+        # 'LG전자'처럼 합성어 안에서 찾은 경우엔 잘라내지 않고 제목을 그대로 유지
+        if is_word_boundary(full_title, start, end):
+            full_title = full_title[:start] + full_title[end:]
+        return found_brand, ' '.join(full_title.split())
+
+    words = full_title.split()
+    if len(words) > 1:
+        return words[0], ' '.join(words[1:])
+    return "", full_title
@@ -0,0 +1,40 @@
+# ssg_cache.py - 스크래핑 결과 디스크 캐시 (diskcache 없으면 캐시 비활성)
+import hashlib
+from typing import Any, Optional
+
+try:
+    import diskcache
+    HAS_DISKCACHE = True
+except ImportError:
+    HAS_DISKCACHE = False
+
+CACHE_DIR = ".ssg_cache"
+CACHE_SIZE_LIMIT = 2 ** 30
+DEFAULT_TTL = 6 * 60 * 60  # 6시간
+
+_cache = None
+
+
+def _get_cache():
+    """캐시 디렉터리는 처음 사용할 때 생성"""
+    global _cache
+    if _cache is None and HAS_DISKCACHE:
+        _cache = diskcache.Cache(CACHE_DIR, size_limit=CACHE_SIZE_LIMIT)
+    return _cache
+
+
+def make_cache_key(*parts) -> str:
+    """(query, page, sort ...) 같은 구성 요소로 고정 길이 키 생성"""
+    raw = "|".join(str(p) for p in parts)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def cache_get(key: str) -> Optional[Any]:
+    cache = _get_cache()
+    return cache.get(key) if cache is not None else None
+
+
+def cache_set(key: str, value: Any, ttl: int = DEFAULT_TTL) -> None:
+    cache = _get_cache()
+    if cache is not None:
+        cache.set(key, value, expire=ttl)
@@ -1,5 +1,6 @@
 # ssg_hybrid_scraper.py - SSG Hybrid Scraper (Direct + OCR Fallback)
 import asyncio
+import os
 import re
 import random
 import urllib.parse
@@ -7,6 +8,10 @@ from typing import List, Dict, Any, Optional
 from playwright.async_api import async_playwright
 import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from ssg_cache import make_cache_key, cache_get, cache_set
+from ssg_brands import KNOWN_BRANDS, split_brand_and_name
+from ssg_blocklist import BLOCKED_RESOURCE_TYPES, make_route_blocker
 
 # OCR imports with fallbacks
 try:
@@ -22,12 +27,188 @@ try:
 except ImportError:
     HAS_TESSERACT = False
 
+# Tesseract: 타일을 여러 프로세스로 병렬 OCR 하므로 프로세스당 OpenMP 스레드는 1개
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+TESSERACT_TILE_HEIGHT = 800
+TESSERACT_TILE_OVERLAP = 100  # 타일 경계에서 잘린 줄 보존
+TESSERACT_WORKERS = min(4, os.cpu_count() or 1)
+
+# HTTP fast-path imports with fallbacks
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
 USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 ]
 
-async def get_ssg_products_hybrid(query: str, max_products: int = 30, debug: bool = True) -> List[Dict[str, Any]]:
+# OCR 텍스트 가격 패턴 (모듈 로드 시 1회 컴파일)
+_OCR_PRICE_RE = re.compile(r'(\d{1,3}(?:[,\d]*)?)\s*원')
+_PRICE_RE = re.compile(r'[\d,]+')
+_DIGITS_RE = re.compile(r'\d+')
+
+# OCR 텍스트 정리용: 구두점 → 공백 ('_'는 \w 이므로 유지, 한글/영숫자는 그대로 통과)
+_PUNCT_MAP = str.maketrans({c: ' ' for c in '!"#$%&\'()*+,-./:;<=>?@[\\]^`{|}~·…‘’“”【】「」『』※★☆'})
+
+# 제품 카드 / 필드 셀렉터 (Playwright, selectolax 공용)
+PRODUCT_SELECTORS = [
+    # 2024 layouts
+    ".cunit_t232",
+    ".cunit_t239", 
+    ".cunit_md",
+    ".cunit_t258",
+    
+    # Generic patterns
+    "li[class*='cunit']",
+    ".search_result .cunit",
+    ".item_thmb",
+    ".product_item",
+    ".goods_item",
+    
+    # Fallback patterns
+    "li[data-info]",
+    "div[class*='item']",
+    "article[class*='product']",
+    "*[data-shp-contents-id]"
+]
+TITLE_SELECTORS = [".cunit_info .tx_ko", ".tx_ko", ".cunit_tit", ".prod_tit", "a[title]", ".title"]
+PRICE_SELECTORS = [".cunit_price .ssg_price", ".ssg_price", ".price", ".sell_price", ".tx_num"]
+REVIEW_SELECTORS = [".cunit_info .tx_num", ".review_count", "[class*='review']"]
+
+# 성공한 카드 셀렉터를 호스트별로 기억 (레이아웃 변경 시 버전을 올릴 것)
+SELECTOR_LAYOUT_VERSION = 1
+SELECTOR_CACHE_TTL = 24 * 60 * 60
+
+# HTTP 사전 점검: 이보다 작거나 차단 문구가 있으면 봇 차단 페이지로 판단
+MIN_SEARCH_PAGE_BYTES = 50_000
+BLOCK_PAGE_MARKERS = ("자동입력", "captcha")
+
+# 셀렉터 후보를 페이지 안에서 한 번에 검사 (min개 이상 매칭되는 첫 셀렉터)
+_PROBE_SELECTOR_JS = """
+([selectors, minCount]) => {
+    for (const s of selectors) {
+        let n = 0;
+        try { n = document.querySelectorAll(s).length; } catch (e) { continue; }
+        if (n >= minCount) return {selector: s, count: n};
+    }
+    return null;
+}
+"""
+
+# 직접 스크래핑: 한 번의 evaluate로 필드별 병렬 배열(SoA)을 받아옴
+_DIRECT_EXTRACT_JS = """
+([selector, max, TITLE_SELS, PRICE_SELS, REVIEW_SELS]) => {
+    const HAS_DIGIT = /\\d/;
+
+    const pick = (item, sels, ok) => {
+        for (const s of sels) {
+            const el = item.querySelector(s);
+            const t = el ? (el.textContent || "").trim() : "";
+            if (t && ok(t)) return t;
+        }
+        return "";
+    };
+
+    const titles = [], prices = [], reviews = [];
+    const items = document.querySelectorAll(selector);
+    const n = Math.min(items.length, max);
+    for (let i = 0; i < n; i++) {
+        const item = items[i];
+        titles.push(pick(item, TITLE_SELS, t => t.length > 5));
+        prices.push(pick(item, PRICE_SELS, t => HAS_DIGIT.test(t)));
+        reviews.push(pick(item, REVIEW_SELS, t => HAS_DIGIT.test(t)));
+    }
+    return {titles, prices, reviews};
+}
+"""
+
+# OCR은 렌더링된 화면이 필요하므로 미디어만 차단 (직접 스크래핑은 ssg_blocklist 기본 목록)
+OCR_BLOCKED_RESOURCE_TYPES = frozenset({"media"})
+
+# 호출 간 재사용하는 Playwright / 브라우저 (lazy init, 만든 이벤트 루프에 묶임)
+_PW = None
+_BROWSER = None
+_BROWSER_LOCK = None
+_BROWSER_LOOP = None
+
+
+def _bind_browser_loop():
+    """실행 중인 루프가 바뀌었으면 (asyncio.run 재호출 등) 이전 루프의 핸들을 버리고 락을 새로 만듦"""
+    global _PW, _BROWSER, _BROWSER_LOCK, _BROWSER_LOOP
+    loop = asyncio.get_running_loop()
+    if _BROWSER_LOOP is not loop:
+        # 이전 루프는 이미 닫혔으므로 그 연결은 닫을 수도 재사용할 수도 없음
+        _PW = None
+        _BROWSER = None
+        _BROWSER_LOCK = asyncio.Lock()
+        _BROWSER_LOOP = loop
+
+
+async def _get_browser():
+    """현재 이벤트 루프에서 브라우저를 한 번만 띄워서 재사용"""
+    global _PW, _BROWSER
+    _bind_browser_loop()
+    async with _BROWSER_LOCK:
+        if _BROWSER is None or not _BROWSER.is_connected():
+            if _PW is None:
+                _PW = await async_playwright().start()
+            _BROWSER = await _PW.chromium.launch(
+                headless=True,
+                args=['--no-sandbox', '--disable-dev-shm-usage']
+            )
+    return _BROWSER
+
+
+async def close_browser():
+    """재사용 중인 브라우저 / Playwright 종료 (현재 루프에서 만든 것만)"""
+    global _PW, _BROWSER
+    _bind_browser_loop()
+    if _BROWSER is not None:
+        await _BROWSER.close()
+        _BROWSER = None
+    if _PW is not None:
+        await _PW.stop()
+        _PW = None
+
+
+def _selector_cache_key(url: str) -> str:
+    return make_cache_key("selector", urllib.parse.urlparse(url).netloc, SELECTOR_LAYOUT_VERSION)
+
+
+def ordered_product_selectors(url: str) -> List[str]:
+    """지난번에 맞았던 셀렉터를 맨 앞으로"""
+    winner = cache_get(_selector_cache_key(url))
+    if winner in PRODUCT_SELECTORS:
+        return [winner] + [s for s in PRODUCT_SELECTORS if s != winner]
+    return PRODUCT_SELECTORS
+
+
+def remember_product_selector(url: str, selector: str):
+    cache_set(_selector_cache_key(url), selector, ttl=SELECTOR_CACHE_TTL)
+
+
+def build_search_url(query: str) -> str:
+    """SSG 판매순 검색 URL"""
+    encoded_query = urllib.parse.quote(query)
+    return f"https://www.ssg.com/search.ssg?target=all&query={encoded_query}&page=1&sort=sale"
+
+
+async def get_ssg_products_hybrid(query: str, max_products: int = 30, debug: bool = True, use_cache: bool = True) -> List[Dict[str, Any]]:
     """
     SSG.COM에서 제품 정보를 수집합니다.
     1차: 직접 HTML 스크래핑 시도
@@ -37,6 +218,7 @@ async def get_ssg_products_hybrid(query: str, max_products: int = 30, debug: boo
         query: 검색어
         max_products: 최대 제품 수
         debug: 디버그 모드
+        use_cache: 디스크 캐시 사용 여부 (TTL 6시간)
     
     Returns:
         제품 데이터 리스트
@@ -45,9 +227,42 @@ async def get_ssg_products_hybrid(query: str, max_products: int = 30, debug: boo
     print(f"🔄 SSG Hybrid Scraper - Query: '{query}'")
     print("=" * 50)
     
-    # Phase 1: Try direct HTML scraping
-    print("1️⃣ Attempting direct HTML scraping...")
-    direct_results = await try_direct_scraping(query, max_products, debug)
+    cache_key = make_cache_key("hybrid", query, max_products)
+    if use_cache:
+        cached = cache_get(cache_key)
+        if cached is not None:
+            print(f"💾 Cache hit: {len(cached)} products")
+            return cached
+    
+    products = await _scrape_hybrid(query, max_products, debug)
+    
+    # 오류 항목 없이 충분한 제품(5개 이상)을 얻은 결과만 캐시 (저하된 결과는 6시간 고정되지 않도록)
+    if use_cache and not any("error" in p for p in products) and sum(1 for p in products if p.get("product_name")) >= 5:
+        cache_set(cache_key, products)
+    
+    return products
+
+
+async def _scrape_hybrid(query: str, max_products: int, debug: bool) -> List[Dict[str, Any]]:
+    """HTTP → 직접 스크래핑 → OCR 순서로 실제 수집"""
+    
+    # Phase 0: Cheap HTTP probe (skip the browser when possible)
+    blocked, html = await probe_search_page(build_search_url(query), debug)
+    
+    if blocked:
+        print("⚠️  Bot-check page detected, skipping direct scraping")
+        direct_results = []
+    else:
+        direct_results = parse_search_html(html, max_products, build_search_url(query)) if html else []
+        successful_products = [p for p in direct_results if "error" not in p and p.get("product_name")]
+        
+        if len(successful_products) >= 5:
+            print(f"✅ HTTP scraping successful: {len(successful_products)} products")
+            return direct_results
+        
+        # Phase 1: Try direct HTML scraping
+        print("1️⃣ Attempting direct HTML scraping...")
+        direct_results = await try_direct_scraping(query, max_products, debug)
     
     # Check if direct scraping was successful
     successful_products = [p for p in direct_results if "error" not in p and p.get("product_name")]
@@ -99,274 +314,276 @@ async def get_ssg_products_hybrid(query: str, max_products: int = 30, debug: boo
     return combined_results[:max_products]
 
 
+async def probe_search_page(url: str, debug: bool) -> tuple[bool, str]:
+    """
+    httpx로 검색 페이지를 먼저 받아 봅니다.
+    
+    Returns:
+        (봇 차단 페이지 여부, HTML). httpx가 없거나 요청이 실패하면 (False, "")
+    """
+    
+    if not HAS_HTTPX:
+        return False, ""
+    
+    try:
+        async with httpx.AsyncClient(follow_redirects=True, timeout=10) as client:
+            response = await client.get(url, headers={
+                "User-Agent": random.choice(USER_AGENTS),
+                "Accept-Language": "ko-KR,ko;q=0.9"
+            })
+    except Exception as e:
+        if debug:
+            print(f"   HTTP probe failed: {str(e)[:40]}...")
+        return False, ""
+    
+    text = response.text
+    text_lower = text.lower()
+    blocked = (
+        response.status_code != 200
+        or len(response.content) < MIN_SEARCH_PAGE_BYTES
+        or any(marker in text_lower for marker in BLOCK_PAGE_MARKERS)
+    )
+    
+    if debug:
+        print(f"🌐 HTTP probe: status={response.status_code} bytes={len(response.content):,} blocked={blocked}")
+    
+    return blocked, "" if blocked else text
+
+
+def parse_search_html(html: str, max_products: int, url: str) -> List[Dict[str, Any]]:
+    """selectolax로 정적 HTML에서 제품 추출 (브라우저 없이)"""
+    
+    if not HAS_SELECTOLAX:
+        return []
+    
+    tree = LexborHTMLParser(html)
+    items = []
+    for selector in ordered_product_selectors(url):
+        items = tree.css(selector)
+        if len(items) >= 5:  # Reasonable threshold
+            break
+    else:
+        return []
+    
+    items = items[:max_products]
+    titles = [_first_node_text(item, TITLE_SELECTORS, lambda t: len(t) > 5) for item in items]
+    prices = [_parse_price_int(_first_node_text(item, PRICE_SELECTORS, _DIGITS_RE.search)) for item in items]
+    reviews = [_parse_digits(_first_node_text(item, REVIEW_SELECTORS, _DIGITS_RE.search)) for item in items]
+    
+    return [p for p in map(build_product_direct, range(1, len(titles) + 1), titles, prices, reviews) if p]
+
+
+def _first_node_text(node, selectors: List[str], ok) -> str:
+    """셀렉터 순서대로 첫 조건 만족 텍스트 (JS pick()과 동일)"""
+    for selector in selectors:
+        element = node.css_first(selector)
+        text = element.text().strip() if element else ""
+        if text and ok(text):
+            return text
+    return ""
+
+
 async def try_direct_scraping(query: str, max_products: int, debug: bool) -> List[Dict[str, Any]]:
     """직접 HTML 스크래핑 시도"""
     
     products = []
-    encoded_query = urllib.parse.quote(query)
-    url = f"https://www.ssg.com/search.ssg?target=all&query={encoded_query}&page=1&sort=sale"
+    url = build_search_url(query)
     
-    async with async_playwright() as p:
-        browser = None
+    context = None
+    try:
+        if debug:
+            print(f"🌐 Connecting to: {url}")
+        
+        browser = await _get_browser()
+        context = await browser.new_context(
+            user_agent=random.choice(USER_AGENTS),
+            locale='ko-KR',
+            viewport={'width': 1920, 'height': 1080}
+        )
+        await context.route("**/*", make_route_blocker(BLOCKED_RESOURCE_TYPES))
+        page = await context.new_page()
+        
+        # Navigate to page
+        await page.goto(url, wait_until='networkidle', timeout=30000)
+        await page.wait_for_timeout(3000)
+        
+        # Scroll to load more products
+        for i in range(2):
+            await page.evaluate("window.scrollTo(0, window.scrollY + 1000)")
+            await page.wait_for_timeout(1000)
+        
+        if debug:
+            print("🔍 Searching for product elements...")
+        
+        # One in-page probe over all candidate selectors (polls until one matches)
+        used_selector = None
+        item_count = 0
         try:
+            handle = await page.wait_for_function(_PROBE_SELECTOR_JS, arg=[ordered_product_selectors(url), 5], timeout=3000)
+            probe = await handle.json_value()
+            used_selector, item_count = probe["selector"], probe["count"]
             if debug:
-                print(f"🌐 Connecting to: {url}")
-            
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent=random.choice(USER_AGENTS),
-                locale='ko-KR',
-                viewport={'width': 1920, 'height': 1080}
-            )
-            page = await context.new_page()
-            
-            # Navigate to page
-            await page.goto(url, wait_until='networkidle', timeout=30000)
-            await page.wait_for_timeout(3000)
-            
-            # Scroll to load more products
-            for i in range(2):
-                await page.evaluate("window.scrollTo(0, window.scrollY + 1000)")
-                await page.wait_for_timeout(1000)
-            
+                print(f"✅ Using selector: {used_selector} ({item_count} items)")
+        except Exception as e:
             if debug:
-                print("🔍 Searching for product elements...")
-            
-            # Enhanced selectors for SSG.COM
-            selectors_to_try = [
-                # 2024 layouts
-                ".cunit_t232",
-                ".cunit_t239", 
-                ".cunit_md",
-                ".cunit_t258",
-                
-                # Generic patterns
-                "li[class*='cunit']",
-                ".search_result .cunit",
-                ".item_thmb",
-                ".product_item",
-                ".goods_item",
-                
-                # Fallback patterns
-                "li[data-info]",
-                "div[class*='item']",
-                "article[class*='product']",
-                "*[data-shp-contents-id]"
-            ]
-            
-            items = []
-            used_selector = None
-            
-            for selector in selectors_to_try:
-                try:
-                    if debug:
-                        print(f"   Trying: {selector}")
-                    
-                    await page.wait_for_selector(selector, timeout=3000)
-                    found_items = await page.query_selector_all(selector)
-                    
-                    if debug:
-                        print(f"   Found: {len(found_items)} elements")
-                    
-                    if len(found_items) >= 5:  # Reasonable threshold
-                        items = found_items
-                        used_selector = selector
-                        if debug:
-                            print(f"✅ Using selector: {selector} ({len(items)} items)")
-                        break
-                    
-                except Exception as e:
-                    if debug:
-                        print(f"   Failed: {str(e)[:30]}...")
-                    continue
-            
-            if not items:
-                if debug:
-                    # Take screenshot for debugging
-                    await page.screenshot(path=f"debug_ssg_direct_{query}.png")
-                    print("📸 Debug screenshot saved")
-                
-                return [{"error": "No products found with direct scraping", "url": url, "debug_screenshot": f"debug_ssg_direct_{query}.png"}]
-            
-            # Extract product data
+                print(f"   Selector probe failed: {str(e)[:30]}...")
+        
+        if not used_selector:
             if debug:
-                print(f"📦 Extracting data from {len(items)} products...")
+                # Take screenshot for debugging
+                png_bytes = await page.screenshot()
+                await asyncio.to_thread(_write_bytes, f"debug_ssg_direct_{query}.png", png_bytes)
+                print("📸 Debug screenshot saved")
             
-            for i, item in enumerate(items[:max_products]):
-                try:
-                    product_data = await extract_product_data_direct(item, i + 1)
-                    
-                    if product_data and product_data.get("product_name"):
-                        products.append(product_data)
-                        
-                        if debug and i < 3:  # Show first 3
-                            print(f"   {i+1}. {product_data.get('brand', 'N/A')[:12]} | {product_data.get('product_name', 'N/A')[:35]} | {product_data.get('price', 0):,}원")
-                
-                except Exception as e:
-                    if debug:
-                        print(f"   Error item {i+1}: {str(e)[:40]}...")
-                    continue
-            
-        except Exception as e:
-            if debug:
-                print(f"❌ Direct scraping error: {e}")
-            return [{"error": f"Direct scraping failed: {e}"}]
+            return [{"error": "No products found with direct scraping", "url": url, "debug_screenshot": f"debug_ssg_direct_{query}.png"}]
+        
+        # Extract product data
+        if debug:
+            print(f"📦 Extracting data from {item_count} products...")
+        
+        fields = await page.evaluate(
+            _DIRECT_EXTRACT_JS,
+            [used_selector, max_products, TITLE_SELECTORS, PRICE_SELECTORS, REVIEW_SELECTORS]
+        )
+        titles = fields["titles"]
+        prices = [_parse_price_int(t) for t in fields["prices"]]
+        reviews = [_parse_digits(t) for t in fields["reviews"]]
+        
+        products = [p for p in map(build_product_direct, range(1, len(titles) + 1), titles, prices, reviews) if p]
+        
+        # 렌더링된 페이지에서 실제로 추출까지 된 셀렉터만 다음 번 우선순위로 기억
+        if len(products) >= 5:
+            remember_product_selector(url, used_selector)
+        
+        if debug:
+            for product_data in products[:3]:  # Show first 3
+                print(f"   {product_data['rank']}. {product_data.get('brand', 'N/A')[:12]} | {product_data.get('product_name', 'N/A')[:35]} | {product_data.get('price', 0):,}원")
         
-        finally:
-            if browser:
-                await browser.close()
+    except Exception as e:
+        if debug:
+            print(f"❌ Direct scraping error: {e}")
+        return [{"error": f"Direct scraping failed: {e}"}]
     
+    finally:
+        if context:
+            await context.close()
+
     if debug:
         print(f"📊 Direct scraping result: {len(products)} products")
     
     return products
 
 
-async def extract_product_data_direct(item, rank: int) -> Optional[Dict[str, Any]]:
-    """직접 스크래핑에서 제품 데이터 추출"""
+def _parse_price_int(text: str) -> int:
+    """가격 텍스트 → 정수 (실패 시 0)"""
+    if not text:
+        return 0
+    match = _PRICE_RE.search(text.replace(' ', '').replace('원', ''))
+    if not match:
+        return 0
+    try:
+        return int(match.group().replace(',', ''))
+    except ValueError:
+        return 0
+
+
+def _parse_digits(text: str) -> int:
+    """텍스트의 첫 숫자열 → 정수 (실패 시 0)"""
+    match = _DIGITS_RE.search(text) if text else None
+    return int(match.group()) if match else 0
+
+
+def build_product_direct(rank: int, full_title: str, price: int, review_count: int) -> Optional[Dict[str, Any]]:
+    """직접 스크래핑 필드 배열의 한 행으로 제품 데이터 생성"""
     
-    product_data = {
-        "rank": rank,
-        "brand": "",
-        "product_name": "",
-        "price": 0,
-        "review_count": 0,
-        "rating": 0.0
-    }
+    if not full_title:
+        return None
     
-    try:
-        # Extract title
-        title_selectors = [
-            ".cunit_info .tx_ko",
-            ".tx_ko",
-            ".cunit_tit",
-            ".prod_tit",
-            "a[title]",
-            ".title"
-        ]
-        
-        for t_sel in title_selectors:
-            title_element = await item.query_selector(t_sel)
-            if title_element:
-                full_title = await title_element.text_content()
-                if full_title and len(full_title.strip()) > 5:
-                    brand, product_name = parse_brand_and_name(full_title.strip())
-                    product_data["brand"] = brand
-                    product_data["product_name"] = product_name
-                    product_data["full_title"] = full_title.strip()
-                    break
-        
-        # Extract price
-        price_selectors = [
-            ".cunit_price .ssg_price",
-            ".ssg_price",
-            ".price",
-            ".sell_price",
-            ".tx_num"
-        ]
-        
-        for p_sel in price_selectors:
-            price_element = await item.query_selector(p_sel)
-            if price_element:
-                price_text = await price_element.text_content()
-                if price_text:
-                    price_match = re.search(r'[\d,]+', price_text.replace(' ', '').replace('원', ''))
-                    if price_match:
-                        try:
-                            product_data["price"] = int(price_match.group().replace(',', ''))
-                            break
-                        except:
-                            continue
-        
-        # Extract review count
-        review_selectors = [
-            ".cunit_info .tx_num",
-            ".review_count",
-            "[class*='review']"
-        ]
-        
-        for r_sel in review_selectors:
-            review_element = await item.query_selector(r_sel)
-            if review_element:
-                review_text = await review_element.text_content()
-                if review_text:
-                    review_match = re.search(r'(\d+)', review_text)
-                    if review_match:
-                        product_data["review_count"] = int(review_match.group(1))
-                        break
-        
-        return product_data if product_data["product_name"] else None
-        
-    except:
+    brand, product_name = parse_brand_and_name(full_title)
+    if not product_name:
         return None
+    
+    return {
+        "rank": rank,
+        "brand": brand,
+        "product_name": product_name,
+        "price": price,
+        "review_count": review_count,
+        "rating": 0.0,
+        "full_title": full_title
+    }
 
 
 async def try_ocr_scraping(query: str, max_products: int, debug: bool) -> List[Dict[str, Any]]:
     """OCR 스크린샷 방식으로 스크래핑"""
     
     products = []
-    encoded_query = urllib.parse.quote(query)
-    url = f"https://www.ssg.com/search.ssg?target=all&query={encoded_query}&page=1&sort=sale"
+    url = build_search_url(query)
     
-    async with async_playwright() as p:
-        browser = None
-        try:
-            if debug:
-                print("📸 Taking screenshot for OCR...")
-            
-            # Launch browser with more human-like settings
-            browser = await p.chromium.launch(
-                headless=False,  # Show browser briefly
-                args=['--no-sandbox', '--disable-dev-shm-usage']
-            )
-            
-            context = await browser.new_context(
-                user_agent=random.choice(USER_AGENTS),
-                locale='ko-KR',
-                viewport={'width': 1920, 'height': 1080}
-            )
-            page = await context.new_page()
-            
-            # Remove automation indicators
-            await page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => false,
-                });
-            """)
-            
-            await page.goto(url, wait_until='networkidle', timeout=30000)
-            await page.wait_for_timeout(5000)  # Wait for full load
-            
-            # Scroll to load more products
-            for i in range(3):
-                await page.evaluate("window.scrollTo(0, window.scrollY + 800)")
-                await page.wait_for_timeout(1500)
-            
-            # Take full page screenshot
-            screenshot_path = f"ssg_ocr_{query}.png"
-            await page.screenshot(path=screenshot_path, full_page=True)
-            
-            if debug:
-                print(f"📸 Screenshot saved: {screenshot_path}")
-            
-            await browser.close()
-            
-            # Process screenshot with OCR
-            if debug:
-                print("🔍 Processing screenshot with OCR...")
-            
-            products = process_ssg_screenshot_with_ocr(screenshot_path, max_products, debug)
-            
-        except Exception as e:
-            if debug:
-                print(f"❌ OCR scraping error: {e}")
-            if browser:
-                await browser.close()
-            return [{"error": f"OCR scraping failed: {e}"}]
+    context = None
+    try:
+        if debug:
+            print("📸 Taking screenshot for OCR...")
+        
+        browser = await _get_browser()
+        context = await browser.new_context(
+            user_agent=random.choice(USER_AGENTS),
+            locale='ko-KR',
+            viewport={'width': 1920, 'height': 1080}
+        )
+        await context.route("**/*", make_route_blocker(OCR_BLOCKED_RESOURCE_TYPES))
+        page = await context.new_page()
+        
+        # Remove automation indicators
+        await page.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => false,
+            });
+        """)
+        
+        await page.goto(url, wait_until='networkidle', timeout=30000)
+        await page.wait_for_timeout(5000)  # Wait for full load
+        
+        # Scroll to load more products
+        for i in range(3):
+            await page.evaluate("window.scrollTo(0, window.scrollY + 800)")
+            await page.wait_for_timeout(1500)
+        
+        # Take full page screenshot
+        screenshot_path = f"ssg_ocr_{query}.png"
+        png_bytes = await page.screenshot(full_page=True)
+        await asyncio.to_thread(_write_bytes, screenshot_path, png_bytes)
+        
+        if debug:
+            print(f"📸 Screenshot saved: {screenshot_path}")
+        
+        await context.close()
+        context = None
+        
+        # Process screenshot with OCR
+        if debug:
+            print("🔍 Processing screenshot with OCR...")
+        
+        products = await asyncio.to_thread(process_ssg_screenshot_with_ocr, screenshot_path, max_products, debug)
+        
+    except Exception as e:
+        if debug:
+            print(f"❌ OCR scraping error: {e}")
+        return [{"error": f"OCR scraping failed: {e}"}]
+    
+    finally:
+        if context:
+            await context.close()
     
     return products
 
 
+def _write_bytes(path: str, data: bytes):
+    """파일 쓰기 (asyncio.to_thread 로 이벤트 루프 밖에서 실행)"""
+    with open(path, "wb") as f:
+        f.write(data)
+
+
 def process_ssg_screenshot_with_ocr(screenshot_path: str, max_products: int, debug: bool) -> List[Dict[str, Any]]:
     """스크린샷을 OCR로 처리하여 제품 데이터 추출"""
     
@@ -443,10 +660,9 @@ def extract_with_tesseract_ssg(screenshot_path: str, max_products: int, debug: b
         import pytesseract
         
         image = Image.open(screenshot_path)
-        text = pytesseract.image_to_string(image, lang='kor+eng')
         
-        # Split into lines and try to find products
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        # OCR overlapping tiles in parallel, then merge into lines
+        lines = ocr_lines_tesseract_tiled(image)
         
         current_product_lines = []
         
@@ -480,6 +696,42 @@ def extract_with_tesseract_ssg(screenshot_path: str, max_products: int, debug: b
     return products
 
 
+def ocr_lines_tesseract_tiled(image) -> List[str]:
+    """긴 전체 페이지 스크린샷을 겹치는 가로 타일로 나눠 병렬 OCR 후 줄 단위로 합침"""
+    
+    width, height = image.size
+    step = TESSERACT_TILE_HEIGHT - TESSERACT_TILE_OVERLAP
+    tiles = [
+        image.crop((0, y, width, min(y + TESSERACT_TILE_HEIGHT, height)))
+        for y in range(0, max(height - TESSERACT_TILE_OVERLAP, 1), step)
+    ]
+    
+    # pytesseract runs tesseract as a subprocess, so threads scale across cores
+    with ThreadPoolExecutor(max_workers=TESSERACT_WORKERS) as executor:
+        texts = list(executor.map(lambda tile: pytesseract.image_to_string(tile, lang='kor+eng'), tiles))
+    
+    lines = []
+    last_index = len(texts) - 1
+    for index, text in enumerate(texts):
+        tile_lines = [line.strip() for line in text.split('\n') if line.strip()]
+        
+        # 안쪽 타일 경계에 걸린 줄은 잘린 채 인식되므로 버림 (겹침 영역 덕분에 이웃 타일에 온전히 있음)
+        if index > 0:
+            tile_lines = tile_lines[1:]
+        if index < last_index:
+            tile_lines = tile_lines[:-1]
+        
+        # Drop lines that the overlap region already produced in the previous tile
+        overlap = 0
+        for k in range(min(len(lines), len(tile_lines), 5), 0, -1):
+            if lines[-k:] == tile_lines[:k]:
+                overlap = k
+                break
+        lines.extend(tile_lines[overlap:])
+    
+    return lines
+
+
 def group_ocr_results_by_position(ocr_result: List, tolerance: int = 80) -> List[List]:
     """OCR 결과를 세로 위치별로 그룹화 (제품 행별)"""
     
@@ -525,21 +777,20 @@ def parse_ocr_text_to_product_ssg(text: str, rank: int) -> Optional[Dict[str, An
     }
     
     # Extract price
-    price_match = re.search(r'(\d{1,3}(?:[,\d]*)?)\s*원', text)
+    price_match = _OCR_PRICE_RE.search(text)
     if price_match:
         try:
             product_data["price"] = int(price_match.group(1).replace(',', ''))
         except:
             pass
     
-    # Remove price from text to get product name
+    # Remove price from text to get product name (every occurrence, like the original replace)
     product_text = text
     if price_match:
-        product_text = text.replace(price_match.group(0), '').strip()
+        product_text = text.replace(price_match.group(0), ' ').strip()
     
-    # Clean up text
-    product_text = re.sub(r'\s+', ' ', product_text)
-    product_text = re.sub(r'[^\w\s가-힣]', ' ', product_text).strip()
+    # Clean up text (punctuation → space, collapse whitespace)
+    product_text = ' '.join(product_text.translate(_PUNCT_MAP).split())
     
     # Extract brand and product name
     brand, product_name = parse_brand_and_name(product_text)
@@ -550,30 +801,9 @@ def parse_ocr_text_to_product_ssg(text: str, rank: int) -> Optional[Dict[str, An
     return product_data if (product_name and len(product_name) > 3) or product_data["price"] > 0 else None
 
 
-def parse_brand_and_name(full_text: str, known_brands: List) -> tuple[str, str]:
-    """텍스트에서 브랜드와 제품명 분리"""
-    
-    text_lower = full_text.lower()
-    found_brand = ""
-    
-    for brand in known_brands:
-        if brand.lower() in text_lower:
-            found_brand = brand
-            break
-    
-    if found_brand:
-        product_name = full_text
-        for variant in [found_brand, found_brand.upper(), found_brand.lower()]:
-            product_name = re.sub(rf'\b{re.escape(variant)}\b\s*', '', product_name).strip()
-        
-        product_name = re.sub(r'\s+', ' ', product_name)
-        return found_brand, product_name
-    else:
-        words = full_text.split()
-        if len(words) > 1:
-            return words[0], ' '.join(words[1:])
-        else:
-            return "", full_text
+def parse_brand_and_name(full_text: str, known_brands: Optional[List[str]] = None) -> tuple[str, str]:
+    """텍스트에서 브랜드와 제품명 분리 (ssg_brands 공용 규칙: 가장 앞, 같은 위치면 긴 브랜드)"""
+    return split_brand_and_name(full_text, known_brands if known_brands is not None else KNOWN_BRANDS)
 
 
 async def main():
@@ -591,7 +821,10 @@ async def main():
     print(f"🎯 Target: {max_products} products")
     print()
     
-    products = await get_ssg_products_hybrid(query, max_products, debug=True)
+    try:
+        products = await get_ssg_products_hybrid(query, max_products, debug=True)
+    finally:
+        await close_browser()
     
     print("\n" + "=" * 50)
     print("📊 FINAL RESULTS:")
@@ -630,4 +863,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if HAS_UVLOOP:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -1,8 +1,21 @@
 # ssg_paginate.py
-import asyncio, json
+import asyncio, csv
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-import pandas as pd
+import orjson
 from quick_check_ssg import grab  # 같은 폴더에 있는 grab() 사용
+from ssg_cache import make_cache_key, cache_get, cache_set
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
 
 def set_qs(url: str, **params):
     u = urlparse(url)
@@ -12,35 +25,85 @@ def set_qs(url: str, **params):
     new_q = urlencode({k: v[0] for k, v in qs.items()}, doseq=False)
     return urlunparse((u.scheme, u.netloc, u.path, u.params, new_q, u.fragment))
 
-def item_key(row: dict) -> str:
-    # itemId 우선 → 없으면 url → 제목+이미지
+def set_page(url: str, page: int) -> str:
+    # page 파라미터만 바꿀 때의 빠른 경로: urllib.parse 왕복 없이 문자열 스캔
+    if "#" in url:
+        return set_qs(url, page=page)
+    i = url.find("?page=")
+    if i < 0:
+        i = url.find("&page=")
+    if i < 0:
+        sep = "&" if "?" in url else "?"
+        return f"{url}{sep}page={page}"
+    i += 6
+    j = url.find("&", i)
+    return url[:i] + str(page) + (url[j:] if j >= 0 else "")
+
+def _hash_key(key: str) -> int:
+    if HAS_XXHASH:
+        return xxhash.xxh64_intdigest(key.encode())
+    return hash(key)
+
+def item_key_hash(row: dict) -> int:
+    # itemId 우선 → 없으면 url → 제목+이미지 (split 없이 인덱스로 잘라냄)
     url = (row.get("url") or "")
-    if "itemId=" in url:
-        return url.split("itemId=")[1].split("&")[0]
+    i = url.find("itemId=")
+    if i >= 0:
+        j = url.find("&", i + 7)
+        return _hash_key(url[i + 7:j if j >= 0 else len(url)])
     if url:
-        return url
-    return f"t:{row.get('title','')}|i:{row.get('image','')}"
+        return _hash_key(url)
+    return _hash_key(f"t:{row.get('title','')}|i:{row.get('image','')}")
 
-async def crawl_ssg(query_url: str, start_page=1, max_pages=5, max_items_per_page=80, headless=True):
-    seen = set()
-    out = []
+# CSV 컬럼 (grab() 결과 + page)
+FIELDS = ["title", "brand", "price", "rating", "review_count", "rating_text", "review_text", "url", "image", "page"]
+
+async def iter_ssg_pages(query_url: str, start_page=1, max_pages=5, max_items_per_page=80, headless=True, use_cache=True):
+    """페이지 단위로 (page, 새로 추가된 rows) 를 yield (페이지별 캐시 → 중단 후 재실행 시 이어받기)"""
+    seen: set[int] = set()
+    total = 0
     for p in range(start_page, start_page + max_pages):
-        url_p = set_qs(query_url, page=p)
-        items = await grab(url_p, max_items=max_items_per_page, headless=headless)
-        added = 0
+        url_p = set_page(query_url, p)
+        cache_key = make_cache_key("ssg_page", url_p, max_items_per_page)
+        items = cache_get(cache_key) if use_cache else None
+        if items is None:
+            items = await grab(url_p, max_items=max_items_per_page, headless=headless)
+            if use_cache and items:
+                cache_set(cache_key, items)
+        added = []
         for r in items:
-            k = item_key(r)
+            k = item_key_hash(r)
             if k in seen: 
                 continue
             seen.add(k)
             r["page"] = p
-            out.append(r)
-            added += 1
-        print(f"[page {p}] got:{len(items)}  added:{added}  total:{len(out)}")
-        if added == 0:  # 다음 페이지에 더 없을 가능성 ↑
+            added.append(r)
+        total += len(added)
+        print(f"[page {p}] got:{len(items)}  added:{len(added)}  total:{total}")
+        yield p, added
+        if not added:  # 다음 페이지에 더 없을 가능성 ↑
             break
+
+async def crawl_ssg(query_url: str, start_page=1, max_pages=5, max_items_per_page=80, headless=True, use_cache=True):
+    out = []
+    async for _, rows in iter_ssg_pages(query_url, start_page, max_pages, max_items_per_page, headless, use_cache):
+        out.extend(rows)
     return out
 
+async def crawl_ssg_to_files(query_url: str, out: str, start_page=1, max_pages=5, max_items_per_page=80, headless=True, use_cache=True) -> int:
+    """페이지가 끝날 때마다 {out}.csv / {out}.ndjson 에 바로 기록 (메모리에 모으지 않음)"""
+    total = 0
+    with open(f"{out}.csv", "w", encoding="utf-8-sig", newline="") as csv_f, \
+         open(f"{out}.ndjson", "wb") as json_f:
+        csv_w = csv.DictWriter(csv_f, fieldnames=FIELDS, extrasaction="ignore")
+        csv_w.writeheader()
+        async for _, rows in iter_ssg_pages(query_url, start_page, max_pages, max_items_per_page, headless, use_cache):
+            for r in rows:
+                csv_w.writerow(r)
+                json_f.write(orjson.dumps(r, option=orjson.OPT_APPEND_NEWLINE))
+            total += len(rows)
+    return total
+
 if __name__ == "__main__":
     import argparse
     ap = argparse.ArgumentParser()
@@ -50,15 +113,12 @@ if __name__ == "__main__":
     ap.add_argument("--per_page", type=int, default=80)
     ap.add_argument("--headless", action="store_true", help="헤드리스")
     ap.add_argument("--out", default="ssg_out")
+    ap.add_argument("--no_cache", action="store_true", help="페이지 캐시 사용 안 함")
     args = ap.parse_args()
 
-    data = asyncio.run(
-        crawl_ssg(args.url, args.start_page, args.max_pages, args.per_page, headless=args.headless or False)
+    run = uvloop.run if HAS_UVLOOP else asyncio.run
+    total = run(
+        crawl_ssg_to_files(args.url, args.out, args.start_page, args.max_pages, args.per_page, headless=args.headless or False, use_cache=not args.no_cache)
     )
-    print("TOTAL:", len(data))
-    df = pd.DataFrame(data)
-    df.to_csv(f"{args.out}.csv", index=False, encoding="utf-8-sig")
-    with open(f"{args.out}.json","w",encoding="utf-8") as f:
-        json.dump({"url": args.url, "total": len(data), "data": data}, f, ensure_ascii=False, indent=2)
-    print(f"saved: {args.out}.csv / {args.out}.json")
-
+    print("TOTAL:", total)
+    print(f"saved: {args.out}.csv / {args.out}.ndjson")
@@ -1,11 +1,18 @@
 # ssg_purchase_analyzer.py - SSG.COM Purchase Behavior Analysis
 import asyncio
+import contextlib
+import heapq
 import re
 import random
 import urllib.parse
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, NamedTuple
+import orjson
+from collections import Counter, defaultdict
 from datetime import datetime
+from functools import lru_cache
+import numpy as np
+from ssg_brands import split_brand_and_name
+from ssg_blocklist import block_heavy_resources
 
 # Playwright import with error handling
 try:
@@ -15,12 +22,227 @@ except ImportError:
     HAS_PLAYWRIGHT = False
     print("❌ Playwright not available. Install with: pip install playwright")
 
+# Token-bucket rate limiter (없으면 요청 속도 제한 없이 동작)
+try:
+    from aiolimiter import AsyncLimiter
+    HAS_AIOLIMITER = True
+except ImportError:
+    HAS_AIOLIMITER = False
+
 USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 ]
 
-async def analyze_ssg_purchase_behavior(query: str, max_products: int = 50, include_reviews: bool = True) -> Dict[str, Any]:
+# Precompiled patterns (hot per-product parsing)
+_PRICE_RE = re.compile(r'[\d,]+')
+_INT_RE = re.compile(r'\d+')
+_FLOAT_RE = re.compile(r'\d+\.?\d*')
+# 카드 전체 텍스트에서 가격·리뷰 수·평점을 한 번에 (필드 셀렉터가 놓친 값 보충용)
+_CUNIT_RE = re.compile(r'(?P<price>\d[\d,]*)\s*원.*?(?P<review>\d[\d,]*)\s*(?:건|개)?\s*리뷰.*?(?P<rating>\d\.\d)', re.S)
+# save_raw=True 일 때 raw_data에 남기는 제품 필드
+RAW_FIELDS = {"rank", "brand", "product_name", "price", "review_count", "rating", "url"}
+
+# SSG 요청 속도 기본값: 초당 5회, 최대 5회 burst
+DEFAULT_MAX_RATE = 5.0
+DEFAULT_BURST = 5
+
+# Enhanced product / field selectors for SSG
+SELECTOR_CONFIG = {
+    "productSelectors": [
+        ".cunit_t232",
+        ".cunit_t239", 
+        ".cunit_md",
+        "li[class*='cunit']",
+        ".search_result .cunit",
+        ".item_thmb"
+    ],
+    "titleSelectors": [".cunit_info .tx_ko", ".tx_ko", ".cunit_tit", ".prod_tit", "a[title]"],
+    "priceSelectors": [".cunit_price .ssg_price", ".ssg_price", ".price", ".sell_price", ".tx_num"],
+    "discountSelectors": [".cunit_price .blind", ".original_price", ".tx_ko.tx_gray"],
+    "reviewSelectors": [".cunit_info .tx_num", ".review_count", "[class*='review']", ".star + .tx_num"],
+    "ratingSelectors": [".star", ".rating", "[class*='star']"],
+    "badgeSelectors": [".badge", ".cunit_badge", "[class*='best']", "[class*='hot']", "[class*='new']"],
+    "deliverySelectors": [".delivery_info", ".cunit_delivery", "[class*='delivery']"],
+    "sellerSelectors": [".seller_info", ".cunit_seller", "[class*='seller']"]
+}
+
+# 카드 존재/증가 감지용 (모든 상품 셀렉터를 합친 하나의 셀렉터)
+PRODUCT_SEL = ", ".join(SELECTOR_CONFIG["productSelectors"])
+_COUNT_CARDS_JS = "sel => document.querySelectorAll(sel).length"
+_MORE_CARDS_JS = "([sel, prev]) => document.querySelectorAll(sel).length > prev"
+
+# 한 번의 evaluate로 모든 카드의 원시 필드를 수집 (파싱은 Python에서)
+JS_EXTRACT = """
+(config) => {
+    const HAS_DIGIT = /\\d/;
+    const text = el => el ? (el.textContent || "").trim() : "";
+    // 배지 셀렉터는 합쳐서 카드당 한 번만 스캔 (여러 셀렉터에 걸린 노드도 한 번만)
+    const BADGE_SEL = config.badgeSelectors.join(", ");
+
+    // 셀렉터 순서대로 조건을 만족하는 첫 텍스트 (첫 매치에서 바로 반환)
+    const pick = (item, sels, ok, read = text) => {
+        for (const s of sels) {
+            const el = item.querySelector(s);
+            if (!el) continue;
+            const t = read(el);
+            if (t && ok(t)) return t;
+        }
+        return "";
+    };
+
+    // 상품 카드: 10개 이상 잡히는 첫 셀렉터, 없으면 마지막으로 잡힌 셀렉터
+    let items = [];
+    for (const s of config.productSelectors) {
+        const found = document.querySelectorAll(s);
+        if (found.length) items = found;
+        if (found.length >= 10) break;
+    }
+
+    const out = [];
+    const n = Math.min(items.length, config.max);
+    for (let i = 0; i < n; i++) {
+        const item = items[i];
+        const badges = Array.from(item.querySelectorAll(BADGE_SEL), text).filter(Boolean);
+        const link = item.querySelector("a[href]");
+        const price_text = pick(item, config.priceSelectors, t => HAS_DIGIT.test(t));
+        const review_text = pick(item, config.reviewSelectors, t => HAS_DIGIT.test(t));
+        const rating_text = pick(item, config.ratingSelectors, t => HAS_DIGIT.test(t),
+                                 el => el.getAttribute("title") || text(el));
+        out.push({
+            rank: i + 1,
+            full_title: pick(item, config.titleSelectors, t => t.length > 5),
+            price_text,
+            original_text: pick(item, config.discountSelectors, t => t.includes("원") && HAS_DIGIT.test(t)),
+            review_text,
+            rating_text,
+            // 필드 셀렉터가 하나라도 비었을 때만 카드 텍스트를 넘김 (innerText는 레이아웃 비용)
+            card_text: price_text && review_text && rating_text ? "" : (item.innerText || ""),
+            badges,
+            delivery: pick(item, config.deliverySelectors, t => true),
+            seller: pick(item, config.sellerSelectors, t => true),
+            href: link ? link.getAttribute("href") || "" : ""
+        });
+    }
+    return out;
+}
+"""
+
+
+class BrowserPagePool:
+    """브라우저/컨텍스트를 한 번 띄워두고 페이지를 빌려주는 풀 (호출 간 cold start 제거)"""
+    
+    def __init__(self, max_pages: int = 4, browser_type: str = "chromium",
+                 launch_options: Dict[str, Any] = None, context_options: Dict[str, Any] = None,
+                 block_resources: bool = True):
+        self.max_pages = max_pages
+        self.browser_type = browser_type
+        self.launch_options = launch_options or {"headless": True}
+        self.context_options = context_options or {}
+        self.block_resources = block_resources
+        self._slots = asyncio.Semaphore(max_pages)
+        self._idle = []
+        self._pw = None
+        self._browser = None
+        self._context = None
+    
+    async def __aenter__(self):
+        self._pw = await async_playwright().start()
+        self._browser = await getattr(self._pw, self.browser_type).launch(**self.launch_options)
+        self._context = await self._browser.new_context(**self.context_options)
+        if self.block_resources:
+            # 컨텍스트 단위로 등록 → 풀에서 새로 만드는 페이지에도 모두 적용
+            await self._context.route("**/*", block_heavy_resources)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def acquire(self):
+        """유휴 페이지를 꺼내거나 max_pages 한도 안에서 새로 생성"""
+        await self._slots.acquire()
+        try:
+            if self._idle:
+                return self._idle.pop()
+            return await self._context.new_page()
+        except Exception:
+            self._slots.release()
+            raise
+    
+    async def release(self, page):
+        if not page.is_closed():
+            self._idle.append(page)
+        self._slots.release()
+    
+    async def aclose(self):
+        self._idle.clear()
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._pw:
+            await self._pw.stop()
+            self._pw = None
+
+
+# 공용 페이지 풀과 락은 만든 이벤트 루프에 묶임 (asyncio.run 재호출 시 새로 생성)
+_pw_pool = None
+_pw_pool_lock = None
+_pw_pool_loop = None
+_limiters = {}
+
+
+def _get_limiter(max_rate: float, burst: int):
+    """(max_rate, burst) 별로 공유되는 토큰 버킷 — 동시 쿼리들이 같은 한도를 나눠 씀"""
+    if not HAS_AIOLIMITER:
+        return contextlib.nullcontext()
+    key = (max_rate, burst)
+    if key not in _limiters:
+        # burst개 토큰이 burst/max_rate 초마다 채워짐 → 평균 max_rate req/s
+        _limiters[key] = AsyncLimiter(burst, burst / max_rate)
+    return _limiters[key]
+
+
+def _bind_pool_loop():
+    """실행 중인 루프가 바뀌었으면 이전 루프의 풀을 버리고 락을 새로 만듦"""
+    global _pw_pool, _pw_pool_lock, _pw_pool_loop
+    loop = asyncio.get_running_loop()
+    if _pw_pool_loop is not loop:
+        # 이전 루프는 이미 닫혔으므로 그 Playwright 연결은 닫을 수도 재사용할 수도 없음
+        _pw_pool = None
+        _pw_pool_lock = asyncio.Lock()
+        _pw_pool_loop = loop
+
+
+async def _get_pool() -> BrowserPagePool:
+    """모듈 공용 페이지 풀 (현재 루프에서 첫 사용 시 생성)"""
+    global _pw_pool
+    _bind_pool_loop()
+    async with _pw_pool_lock:
+        if _pw_pool is None:
+            _pw_pool = await BrowserPagePool(
+                max_pages=4,
+                browser_type="chromium",
+                context_options={
+                    "user_agent": random.choice(USER_AGENTS),
+                    "locale": "ko-KR",
+                    "viewport": {"width": 1920, "height": 1080}
+                }
+            ).__aenter__()
+    return _pw_pool
+
+
+async def aclose_pool():
+    """종료 시 공용 페이지 풀 정리 (현재 루프에서 만든 것만)"""
+    global _pw_pool
+    _bind_pool_loop()
+    if _pw_pool is not None:
+        await _pw_pool.aclose()
+        _pw_pool = None
+
+
+async def analyze_ssg_purchase_behavior(query: str, max_products: int = 50, include_reviews: bool = True,
+                                        max_rate: float = DEFAULT_MAX_RATE, burst: int = DEFAULT_BURST,
+                                        save_raw: bool = False) -> Dict[str, Any]:
     """
     SSG.COM에서 구매 행동 패턴을 분석합니다.
     
@@ -28,6 +250,9 @@ async def analyze_ssg_purchase_behavior(query: str, max_products: int = 50, incl
         query: 검색어 (예: "헤어드라이기")
         max_products: 분석할 최대 제품 수
         include_reviews: 리뷰 데이터 포함 여부
+        max_rate: SSG 요청 평균 속도 (초당 요청 수)
+        burst: 한 번에 허용되는 최대 요청 수
+        save_raw: 저장 JSON에 제품별 핵심 필드(RAW_FIELDS)도 포함할지 여부
     
     Returns:
         구매 행동 분석 결과
@@ -38,7 +263,7 @@ async def analyze_ssg_purchase_behavior(query: str, max_products: int = 50, incl
     print("=" * 60)
     
     # Collect purchase data
-    purchase_data = await crawl_ssg_purchase_data(query, max_products, include_reviews)
+    purchase_data = await crawl_ssg_purchase_data(query, max_products, include_reviews, _get_limiter(max_rate, burst))
     
     if not purchase_data or all("error" in item for item in purchase_data):
         return {"error": "Failed to collect purchase data", "query": query}
@@ -50,110 +275,137 @@ async def analyze_ssg_purchase_behavior(query: str, max_products: int = 50, incl
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = f"ssg_purchase_analysis_{query}_{timestamp}.json"
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump({
-            "query": query,
-            "analysis_time": datetime.now().isoformat(),
-            "total_products": len(purchase_data),
-            "purchase_analysis": analysis,
-            "raw_data": purchase_data
-        }, f, ensure_ascii=False, indent=2)
+    # 직렬화 + 파일 쓰기는 워커 스레드에서 (동시 실행 중인 다른 쿼리를 막지 않도록)
+    payload = {
+        "query": query,
+        "analysis_time": datetime.now().isoformat(),
+        "total_products": len(purchase_data),
+        "purchase_analysis": analysis
+    }
+    if save_raw:
+        # 분석 결과(market_leaders 등)에 이미 전체 dict가 있으므로 원본은 핵심 필드만
+        payload["raw_data"] = [{k: v for k, v in product.items() if k in RAW_FIELDS} for product in purchase_data]
+    await asyncio.to_thread(_write_json, output_file, payload)
     
     print(f"💾 Analysis saved: {output_file}")
     
     return analysis
 
 
-async def crawl_ssg_purchase_data(query: str, max_products: int, include_reviews: bool) -> List[Dict[str, Any]]:
+async def analyze_many(queries: List[str], max_concurrency: int = 4, **kwargs) -> Dict[str, Dict[str, Any]]:
+    """
+    여러 검색어를 동시에 분석합니다 (공용 페이지 풀 공유).
+    
+    Args:
+        queries: 검색어 목록
+        max_concurrency: 동시에 진행할 최대 쿼리 수
+        **kwargs: analyze_ssg_purchase_behavior 에 그대로 전달
+    
+    Returns:
+        {검색어: 분석 결과}
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+    results = {}
+    
+    async def bounded(query):
+        async with sem:
+            results[query] = await analyze_ssg_purchase_behavior(query, **kwargs)
+    
+    # TaskGroup: 하나가 예외로 끝나면 나머지도 취소하고 정리
+    async with asyncio.TaskGroup() as tg:
+        for query in dict.fromkeys(queries):
+            tg.create_task(bounded(query))
+    
+    return {query: results[query] for query in queries}
+
+
+def _write_json(path: str, payload: Dict[str, Any]):
+    """orjson은 UTF-8 bytes를 바로 만들고 NumPy 값도 그대로 직렬화"""
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+
+
+async def crawl_ssg_purchase_data(query: str, max_products: int, include_reviews: bool, limiter=None) -> List[Dict[str, Any]]:
     """SSG.COM에서 구매 관련 데이터를 수집합니다."""
     
     products = []
+    limiter = limiter or _get_limiter(DEFAULT_MAX_RATE, DEFAULT_BURST)
     encoded_query = urllib.parse.quote(query)
     
     # SSG.COM 판매순 정렬 URL
     url = f"https://www.ssg.com/search.ssg?target=all&query={encoded_query}&page=1&sort=sale"
     
-    async with async_playwright() as p:
-        browser = None
+    print("🌐 Connecting to SSG.COM...")
+    try:
+        pool = await _get_pool()
+        page = await pool.acquire()
+    except Exception as e:
+        print(f"❌ SSG crawling error: {e}")
+        return [{"error": str(e)}]
+    
+    try:
+        async with limiter:
+            await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        
+        # 고정 sleep 대신 상품 카드가 DOM에 붙는 순간까지만 대기
         try:
-            print("🌐 Connecting to SSG.COM...")
-            
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent=random.choice(USER_AGENTS),
-                locale='ko-KR',
-                viewport={'width': 1920, 'height': 1080}
-            )
-            page = await context.new_page()
-            
-            await page.goto(url, wait_until='networkidle', timeout=30000)
-            await page.wait_for_timeout(3000)
-            
-            print("📦 Extracting product data...")
-            
-            # Load more products by scrolling if needed
-            for i in range(3):
-                await page.evaluate("window.scrollTo(0, window.scrollY + 1000)")
-                await page.wait_for_timeout(1000)
-            
-            # Enhanced product selectors for SSG
-            product_selectors = [
-                ".cunit_t232",
-                ".cunit_t239", 
-                ".cunit_md",
-                "li[class*='cunit']",
-                ".search_result .cunit",
-                ".item_thmb"
-            ]
-            
-            items = []
-            for selector in product_selectors:
-                try:
-                    await page.wait_for_selector(selector, timeout=5000)
-                    items = await page.query_selector_all(selector)
-                    if len(items) >= 10:
-                        print(f"✅ Found {len(items)} products using: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not items:
-                print("❌ No products found")
-                return [{"error": "No products found", "url": url}]
-            
-            # Extract detailed purchase data
-            for i, item in enumerate(items[:max_products]):
-                try:
-                    product_data = await extract_detailed_product_data(item, i + 1, page, include_reviews)
-                    
-                    if product_data and product_data.get("product_name"):
-                        products.append(product_data)
-                        
-                        # Progress indicator
-                        if i % 10 == 0:
-                            print(f"📊 Processed {i+1}/{min(len(items), max_products)} products...")
-                
-                except Exception as e:
-                    print(f"⚠️  Error processing product {i+1}: {str(e)[:50]}...")
-                    continue
-            
-        except Exception as e:
-            print(f"❌ SSG crawling error: {e}")
-            return [{"error": str(e)}]
+            await page.wait_for_selector(PRODUCT_SEL, state="attached", timeout=10000)
+        except Exception:
+            pass
+        
+        print("📦 Extracting product data...")
+        
+        # Load more products by scrolling: 카드 수가 늘어날 때까지만 기다리고, 안 늘면 중단
+        count = await page.evaluate(_COUNT_CARDS_JS, PRODUCT_SEL)
+        for i in range(3):
+            await page.evaluate("window.scrollTo(0, window.scrollY + 1000)")
+            try:
+                await page.wait_for_function(_MORE_CARDS_JS, arg=[PRODUCT_SEL, count], timeout=3000)
+            except Exception:
+                break
+            count = await page.evaluate(_COUNT_CARDS_JS, PRODUCT_SEL)
+        
+        raw_items = await page.evaluate(JS_EXTRACT, {**SELECTOR_CONFIG, "max": max_products})
+        
+        if not raw_items:
+            print("❌ No products found")
+            return [{"error": "No products found", "url": url}]
+        
+        print(f"✅ Found {len(raw_items)} products")
         
-        finally:
-            if browser:
-                await browser.close()
+        for raw in raw_items:
+            try:
+                product_data = build_product_data(raw)
+                if product_data.get("product_name"):
+                    products.append(product_data)
+            except Exception as e:
+                print(f"⚠️  Error processing product {raw.get('rank')}: {str(e)[:50]}...")
+                continue
+        
+        # Get additional details from product pages if needed (top 10 only)
+        if include_reviews:
+            for product_data in products:
+                if product_data["rank"] <= 10 and product_data.get("url"):
+                    await get_product_page_details(page, product_data["url"], product_data, limiter)
+        
+        print(f"📊 Processed {len(products)}/{len(raw_items)} products")
+        
+    except Exception as e:
+        print(f"❌ SSG crawling error: {e}")
+        return [{"error": str(e)}]
+    
+    finally:
+        await pool.release(page)
     
     print(f"✅ Collected {len(products)} products with purchase data")
     return products
 
 
-async def extract_detailed_product_data(item, rank: int, page, include_reviews: bool) -> Dict[str, Any]:
-    """개별 제품의 상세 구매 데이터를 추출합니다."""
+def build_product_data(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """JS_EXTRACT가 반환한 원시 필드로 제품의 상세 구매 데이터를 만듭니다."""
     
     product_data = {
-        "rank": rank,
+        "rank": raw["rank"],
         "brand": "",
         "product_name": "",
         "price": 0,
@@ -167,241 +419,234 @@ async def extract_detailed_product_data(item, rank: int, page, include_reviews:
         "purchase_indicators": {}
     }
     
-    try:
-        # Extract title and brand
-        title_selectors = [
-            ".cunit_info .tx_ko",
-            ".tx_ko",
-            ".cunit_tit",
-            ".prod_tit",
-            "a[title]"
-        ]
-        
-        for t_sel in title_selectors:
-            title_element = await item.query_selector(t_sel)
-            if title_element:
-                full_title = await title_element.text_content()
-                if full_title and len(full_title.strip()) > 5:
-                    brand, product_name = parse_brand_and_name(full_title.strip())
-                    product_data["brand"] = brand
-                    product_data["product_name"] = product_name
-                    product_data["full_title"] = full_title.strip()
-                    break
-        
-        # Extract pricing information
-        await extract_pricing_data(item, product_data)
-        
-        # Extract purchase indicators
-        await extract_purchase_indicators(item, product_data)
-        
-        # Extract seller and delivery info
-        await extract_seller_delivery_info(item, product_data)
-        
-        # Get product URL for detailed analysis
-        link_element = await item.query_selector("a[href]")
-        if link_element:
-            href = await link_element.get_attribute("href")
-            if href:
-                product_data["url"] = href if href.startswith('http') else f"https://www.ssg.com{href}"
-                
-                # Get additional details from product page if needed
-                if include_reviews and rank <= 10:  # Only for top 10 products
-                    await get_product_page_details(page, product_data["url"], product_data)
+    # Title and brand
+    full_title = raw.get("full_title")
+    if full_title:
+        brand, product_name = parse_brand_and_name(full_title)
+        product_data["brand"] = brand
+        product_data["product_name"] = product_name
+        product_data["full_title"] = full_title
     
-    except Exception as e:
-        product_data["extraction_error"] = str(e)
+    extract_pricing_data(raw, product_data)
+    extract_purchase_indicators(raw, product_data)
+    extract_seller_delivery_info(raw, product_data)
+    fill_from_card_text(raw, product_data)
+    
+    # Product URL for detailed analysis
+    href = raw.get("href")
+    if href:
+        product_data["url"] = href if href.startswith('http') else f"https://www.ssg.com{href}"
     
     return product_data
 
 
-async def extract_pricing_data(item, product_data: Dict[str, Any]):
+def extract_pricing_data(raw: Dict[str, Any], product_data: Dict[str, Any]):
     """가격 정보 추출"""
     
     # Current price
-    price_selectors = [
-        ".cunit_price .ssg_price",
-        ".ssg_price", 
-        ".price",
-        ".sell_price",
-        ".tx_num"
-    ]
-    
-    for p_sel in price_selectors:
-        price_element = await item.query_selector(p_sel)
-        if price_element:
-            price_text = await price_element.text_content()
-            if price_text:
-                price_match = re.search(r'[\d,]+', price_text.replace(' ', '').replace('원', ''))
-                if price_match:
-                    try:
-                        product_data["price"] = int(price_match.group().replace(',', ''))
-                        break
-                    except:
-                        continue
+    price_text = raw.get("price_text")
+    if price_text:
+        price_match = _PRICE_RE.search(price_text.replace(' ', '').replace('원', ''))
+        if price_match:
+            try:
+                product_data["price"] = int(price_match.group().replace(',', ''))
+            except ValueError:
+                pass
     
     # Original price and discount
-    discount_selectors = [
-        ".cunit_price .blind",
-        ".original_price",
-        ".tx_ko.tx_gray"
-    ]
-    
-    for d_sel in discount_selectors:
-        discount_element = await item.query_selector(d_sel)
-        if discount_element:
-            discount_text = await discount_element.text_content()
-            if discount_text and '원' in discount_text:
-                original_match = re.search(r'[\d,]+', discount_text.replace(' ', '').replace('원', ''))
-                if original_match:
-                    try:
-                        original_price = int(original_match.group().replace(',', ''))
-                        product_data["original_price"] = original_price
-                        
-                        # Calculate discount rate
-                        if product_data["price"] > 0:
-                            discount_rate = round(((original_price - product_data["price"]) / original_price) * 100, 1)
-                            product_data["discount_rate"] = discount_rate
-                        break
-                    except:
-                        continue
-
-
-async def extract_purchase_indicators(item, product_data: Dict[str, Any]):
+    discount_text = raw.get("original_text")
+    if discount_text:
+        original_match = _PRICE_RE.search(discount_text.replace(' ', '').replace('원', ''))
+        if original_match:
+            try:
+                original_price = int(original_match.group().replace(',', ''))
+            except ValueError:
+                return
+            product_data["original_price"] = original_price
+            update_discount_rate(product_data)
+
+
+def update_discount_rate(product_data: Dict[str, Any]):
+    """원가와 판매가가 모두 있으면 할인율 계산"""
+    
+    original_price = product_data["original_price"]
+    if product_data["price"] > 0 and original_price > 0:
+        discount_rate = round(((original_price - product_data["price"]) / original_price) * 100, 1)
+        product_data["discount_rate"] = discount_rate
+
+
+def extract_purchase_indicators(raw: Dict[str, Any], product_data: Dict[str, Any]):
     """구매 지표 추출 (리뷰, 평점, 배지 등)"""
     
     # Review count
-    review_selectors = [
-        ".cunit_info .tx_num",
-        ".review_count", 
-        "[class*='review']",
-        ".star + .tx_num"
-    ]
-    
-    for r_sel in review_selectors:
-        review_element = await item.query_selector(r_sel)
-        if review_element:
-            review_text = await review_element.text_content()
-            if review_text:
-                review_match = re.search(r'(\d+)', review_text)
-                if review_match:
-                    product_data["review_count"] = int(review_match.group(1))
-                    break
+    review_text = raw.get("review_text")
+    if review_text:
+        review_match = _INT_RE.search(review_text)
+        if review_match:
+            product_data["review_count"] = int(review_match.group())
     
     # Rating
-    rating_selectors = [
-        ".star",
-        ".rating", 
-        "[class*='star']"
-    ]
-    
-    for rating_sel in rating_selectors:
-        rating_element = await item.query_selector(rating_sel)
-        if rating_element:
-            rating_text = await rating_element.get_attribute("title") or await rating_element.text_content()
-            if rating_text:
-                rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                if rating_match:
-                    try:
-                        product_data["rating"] = float(rating_match.group(1))
-                        break
-                    except:
-                        continue
+    rating_text = raw.get("rating_text")
+    if rating_text:
+        rating_match = _FLOAT_RE.search(rating_text)
+        if rating_match:
+            try:
+                product_data["rating"] = float(rating_match.group())
+            except ValueError:
+                pass
     
     # Badges and indicators
-    badge_selectors = [
-        ".badge",
-        ".cunit_badge", 
-        "[class*='best']",
-        "[class*='hot']",
-        "[class*='new']"
-    ]
-    
-    badges = []
-    for b_sel in badge_selectors:
-        badge_elements = await item.query_selector_all(b_sel)
-        for badge in badge_elements:
-            badge_text = await badge.text_content()
-            if badge_text and badge_text.strip():
-                badges.append(badge_text.strip())
-    
-    product_data["badges"] = badges
-
-
-async def extract_seller_delivery_info(item, product_data: Dict[str, Any]):
+    product_data["badges"] = list(raw.get("badges") or [])
+
+
+def fill_from_card_text(raw: Dict[str, Any], product_data: Dict[str, Any]):
+    """필드 셀렉터로 못 찾은 가격/리뷰/평점을 카드 텍스트 한 번의 스캔으로 보충"""
+    
+    card_text = raw.get("card_text")
+    if not card_text:
+        return
+    
+    match = _CUNIT_RE.search(card_text)
+    if not match:
+        return
+    
+    if not product_data["price"]:
+        product_data["price"] = int(match["price"].replace(',', ''))
+        # 판매가가 여기서 채워졌으면 할인율도 다시 계산
+        update_discount_rate(product_data)
+    if not product_data["review_count"]:
+        product_data["review_count"] = int(match["review"].replace(',', ''))
+    if not product_data["rating"]:
+        product_data["rating"] = float(match["rating"])
+
+
+def extract_seller_delivery_info(raw: Dict[str, Any], product_data: Dict[str, Any]):
     """판매자 및 배송 정보 추출"""
     
-    # Delivery information
-    delivery_selectors = [
-        ".delivery_info",
-        ".cunit_delivery",
-        "[class*='delivery']"
-    ]
-    
-    for d_sel in delivery_selectors:
-        delivery_element = await item.query_selector(d_sel)
-        if delivery_element:
-            delivery_text = await delivery_element.text_content()
-            if delivery_text:
-                product_data["delivery_info"] = delivery_text.strip()
-                break
+    if raw.get("delivery"):
+        product_data["delivery_info"] = raw["delivery"]
     
     # Seller type (SSG direct, marketplace, etc.)
-    seller_selectors = [
-        ".seller_info",
-        ".cunit_seller",
-        "[class*='seller']"
-    ]
-    
-    for s_sel in seller_selectors:
-        seller_element = await item.query_selector(s_sel)
-        if seller_element:
-            seller_text = await seller_element.text_content()
-            if seller_text:
-                product_data["seller_type"] = seller_text.strip()
-                break
+    if raw.get("seller"):
+        product_data["seller_type"] = raw["seller"]
 
 
-async def get_product_page_details(page, product_url: str, product_data: Dict[str, Any]):
+async def get_product_page_details(page, product_url: str, product_data: Dict[str, Any], limiter=None):
     """제품 상세 페이지에서 추가 정보 수집 (선택사항)"""
     # Store parameters for potential future use
-    _ = (page, product_url, product_data)
+    _ = (page, product_url, product_data, limiter)
     
     # This function is intentionally left empty to avoid too many requests
     # In a future version, this could navigate to individual product pages
     # for more detailed information like detailed specifications, reviews, etc.
+    # 실제 page.goto를 추가할 때는 그 직전에만 `async with limiter:`로 토큰을 받을 것
     return None
 
 
+@lru_cache(maxsize=4096)
 def parse_brand_and_name(full_title: str) -> tuple[str, str]:
-    """제품명에서 브랜드와 제품명 분리"""
-    known_brands = [
-        "다이슨", "Dyson", "필립스", "Philips", "파나소닉", "Panasonic",
-        "샤오미", "Xiaomi", "LG", "삼성", "Samsung", "테팔", "브라운", "Braun",
-        "글램팜", "보다나", "유닉스", "살롱드프로", "모즈", "아이디어",
-        "레틴", "바이레텍", "코멘", "클레오"
-    ]
-    
-    title_lower = full_title.lower()
-    found_brand = ""
-    
-    for brand in known_brands:
-        if brand.lower() in title_lower:
-            found_brand = brand
-            break
-    
-    if found_brand:
-        product_name = full_title
-        for variant in [found_brand, found_brand.upper(), found_brand.lower()]:
-            product_name = re.sub(rf'\b{re.escape(variant)}\b\s*', '', product_name).strip()
+    """제품명에서 브랜드와 제품명 분리 (같은 제목은 순위/쿼리 간에 반복되므로 캐시)"""
+    return split_brand_and_name(full_title)
+
+
+class ProductAggregate(NamedTuple):
+    """analyze_* 함수들이 공유하는 단일 패스 집계 결과"""
+    count: int
+    prices: np.ndarray            # price > 0
+    discount_rates: np.ndarray    # 전체 제품
+    review_counts: np.ndarray     # review_count > 0
+    ratings: np.ndarray           # rating > 0
+    brand_counts: Counter
+    badge_counts: Counter
+    brand_prices: Dict[str, list]
+    brand_reviews: Dict[str, list]
+    distinct_brands: int
+    total_reviews: int
+    total_rating: float
+    deep_discount_count: int      # discount_rate > 10
+    has_brand_badge: bool
+    market_candidates: List[Dict[str, Any]]  # market_score > 10
+
+
+def _aggregate(products: List[Dict[str, Any]]) -> ProductAggregate:
+    """제품 목록을 한 번만 순회하며 모든 분석용 누적값을 계산 (market_score도 기록)"""
+    
+    prices, discount_rates, review_counts, ratings = [], [], [], []
+    brand_counts = Counter()
+    badge_counts = Counter()
+    brand_prices = defaultdict(list)
+    brand_reviews = defaultdict(list)
+    brands = set()
+    total_reviews = 0
+    total_rating = 0.0
+    deep_discount_count = 0
+    has_brand_badge = False
+    market_candidates = []
+    
+    for product in products:
+        # 필드는 반복마다 한 번만 조회해 지역 변수로 사용
+        price = product["price"]
+        discount_rate = product.get("discount_rate", 0)
+        review_count = product.get("review_count", 0)
+        rating = product.get("rating", 0)
+        badges = product.get("badges", [])
+        brand = product.get("brand", "Unknown")
         
-        product_name = re.sub(r'\s+', ' ', product_name)
-        return found_brand, product_name
-    else:
-        words = full_title.split()
-        if len(words) > 1:
-            return words[0], ' '.join(words[1:])
-        else:
-            return "", full_title
+        brands.add(product.get("brand", ""))
+        discount_rates.append(discount_rate)
+        total_reviews += review_count
+        total_rating += rating
+        
+        if price > 0:
+            prices.append(price)
+        if review_count > 0:
+            review_counts.append(review_count)
+        if rating > 0:
+            ratings.append(rating)
+        if discount_rate > 10:
+            deep_discount_count += 1
+        
+        if brand:
+            brand_counts[brand] += 1
+            if price > 0:
+                brand_prices[brand].append(price)
+            if review_count > 0:
+                brand_reviews[brand].append(review_count)
+        
+        badge_counts.update(badges)
+        if "브랜드" in str(badges):
+            has_brand_badge = True
+        
+        # Market score (high reviews + good rating + badges)
+        score = 0
+        if review_count > 100:
+            score += review_count / 100
+        if rating >= 4.0:
+            score += rating * 10
+        if badges:
+            score += len(badges) * 5
+        
+        product["market_score"] = score
+        if score > 10:
+            market_candidates.append(product)
+    
+    return ProductAggregate(
+        count=len(products),
+        prices=np.array(prices, dtype=np.int64),
+        discount_rates=np.array(discount_rates, dtype=np.float64),
+        review_counts=np.array(review_counts, dtype=np.int64),
+        ratings=np.array(ratings, dtype=np.float64),
+        brand_counts=brand_counts,
+        badge_counts=badge_counts,
+        brand_prices=brand_prices,
+        brand_reviews=brand_reviews,
+        distinct_brands=len(brands),
+        total_reviews=total_reviews,
+        total_rating=total_rating,
+        deep_discount_count=deep_discount_count,
+        has_brand_badge=has_brand_badge,
+        market_candidates=market_candidates
+    )
 
 
 def analyze_purchase_patterns(products: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
@@ -414,169 +659,122 @@ def analyze_purchase_patterns(products: List[Dict[str, Any]], query: str) -> Dic
     if not valid_products:
         return {"error": "No valid products to analyze"}
     
+    agg = _aggregate(valid_products)
+    
     analysis = {
         "query": query,
-        "total_products_analyzed": len(valid_products),
-        "price_analysis": analyze_price_patterns(valid_products),
-        "brand_analysis": analyze_brand_patterns(valid_products), 
-        "purchase_signals": analyze_purchase_signals(valid_products),
-        "market_insights": generate_market_insights(valid_products, query),
-        "mobile_ads_recommendations": generate_mobile_ads_insights(valid_products, query)
+        "total_products_analyzed": agg.count,
+        "price_analysis": analyze_price_patterns(agg),
+        "brand_analysis": analyze_brand_patterns(agg), 
+        "purchase_signals": analyze_purchase_signals(agg),
+        "market_insights": generate_market_insights(agg, query),
+        "mobile_ads_recommendations": generate_mobile_ads_insights(agg, query)
     }
     
     return analysis
 
 
-def analyze_price_patterns(products: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_price_patterns(agg: ProductAggregate) -> Dict[str, Any]:
     """가격 패턴 분석"""
-    prices = [p["price"] for p in products if p["price"] > 0]
+    prices = agg.prices
     
-    if not prices:
+    if prices.size == 0:
         return {"error": "No price data available"}
     
     return {
         "price_range": {
-            "min": min(prices),
-            "max": max(prices),
-            "average": round(sum(prices) / len(prices), 0),
-            "median": sorted(prices)[len(prices)//2]
+            "min": int(prices.min()),
+            "max": int(prices.max()),
+            "average": round(float(prices.mean()), 0),
+            "median": int(np.partition(prices, prices.size // 2)[prices.size // 2])
         },
         "price_tiers": {
-            "budget": len([p for p in prices if p < 50000]),
-            "mid_range": len([p for p in prices if 50000 <= p <= 200000]),
-            "premium": len([p for p in prices if p > 200000])
+            "budget": int((prices < 50000).sum()),
+            "mid_range": int(((prices >= 50000) & (prices <= 200000)).sum()),
+            "premium": int((prices > 200000).sum())
         },
         "discount_analysis": {
-            "products_with_discount": len([p for p in products if p.get("discount_rate", 0) > 0]),
-            "average_discount": round(sum([p.get("discount_rate", 0) for p in products]) / len(products), 1)
+            "products_with_discount": int(np.count_nonzero(agg.discount_rates > 0)),
+            "average_discount": round(float(agg.discount_rates.mean()), 1)
         }
     }
 
 
-def analyze_brand_patterns(products: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_brand_patterns(agg: ProductAggregate) -> Dict[str, Any]:
     """브랜드 패턴 분석"""
-    brand_counts = {}
-    brand_avg_prices = {}
-    brand_reviews = {}
-    
-    for product in products:
-        brand = product.get("brand", "Unknown")
-        if brand:
-            brand_counts[brand] = brand_counts.get(brand, 0) + 1
-            
-            if product["price"] > 0:
-                if brand not in brand_avg_prices:
-                    brand_avg_prices[brand] = []
-                brand_avg_prices[brand].append(product["price"])
-            
-            if product.get("review_count", 0) > 0:
-                if brand not in brand_reviews:
-                    brand_reviews[brand] = []
-                brand_reviews[brand].append(product["review_count"])
-    
-    # Calculate averages
-    for brand in brand_avg_prices:
-        brand_avg_prices[brand] = round(sum(brand_avg_prices[brand]) / len(brand_avg_prices[brand]), 0)
-    
-    for brand in brand_reviews:
-        brand_reviews[brand] = round(sum(brand_reviews[brand]) / len(brand_reviews[brand]), 0)
-    
     return {
-        "brand_distribution": dict(sorted(brand_counts.items(), key=lambda x: x[1], reverse=True)),
-        "brand_avg_prices": brand_avg_prices,
-        "brand_avg_reviews": brand_reviews,
-        "top_brands": list(sorted(brand_counts.items(), key=lambda x: x[1], reverse=True)[:5])
+        "brand_distribution": dict(agg.brand_counts.most_common()),
+        "brand_avg_prices": {b: round(sum(v) / len(v), 0) for b, v in agg.brand_prices.items()},
+        "brand_avg_reviews": {b: round(sum(v) / len(v), 0) for b, v in agg.brand_reviews.items()},
+        "top_brands": agg.brand_counts.most_common(5)
     }
 
 
-def analyze_purchase_signals(products: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_purchase_signals(agg: ProductAggregate) -> Dict[str, Any]:
     """구매 신호 분석 (리뷰, 평점, 배지 등)"""
     
-    review_counts = [p["review_count"] for p in products if p.get("review_count", 0) > 0]
-    ratings = [p["rating"] for p in products if p.get("rating", 0) > 0]
-    
-    # Badge analysis
-    all_badges = []
-    for product in products:
-        all_badges.extend(product.get("badges", []))
-    
-    badge_counts = {}
-    for badge in all_badges:
-        badge_counts[badge] = badge_counts.get(badge, 0) + 1
+    review_counts = agg.review_counts
+    ratings = agg.ratings
     
     return {
         "review_analysis": {
-            "products_with_reviews": len(review_counts),
-            "avg_review_count": round(sum(review_counts) / len(review_counts), 0) if review_counts else 0,
-            "max_reviews": max(review_counts) if review_counts else 0
+            "products_with_reviews": int(review_counts.size),
+            "avg_review_count": round(float(review_counts.mean()), 0) if review_counts.size else 0,
+            "max_reviews": int(review_counts.max()) if review_counts.size else 0
         },
         "rating_analysis": {
-            "products_with_ratings": len(ratings),
-            "avg_rating": round(sum(ratings) / len(ratings), 1) if ratings else 0,
-            "high_rated_products": len([r for r in ratings if r >= 4.0])
+            "products_with_ratings": int(ratings.size),
+            "avg_rating": round(float(ratings.mean()), 1) if ratings.size else 0,
+            "high_rated_products": int(np.count_nonzero(ratings >= 4.0))
         },
-        "badge_distribution": dict(sorted(badge_counts.items(), key=lambda x: x[1], reverse=True))
+        "badge_distribution": dict(agg.badge_counts.most_common())
     }
 
 
-def generate_market_insights(products: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
+def generate_market_insights(agg: ProductAggregate, query: str) -> Dict[str, Any]:
     """시장 인사이트 생성"""
     
-    # Top performing products (high reviews + good rating)
-    top_products = []
+    # Top performing products (high reviews + good rating), scored in _aggregate
+    # 상위 5개만 필요하므로 전체 정렬 대신 heap 선택
+    top_products = heapq.nlargest(5, agg.market_candidates, key=lambda x: x["market_score"])
     _ = query  # Store query for potential future use
     
-    for product in products:
-        score = 0
-        if product.get("review_count", 0) > 100:
-            score += product["review_count"] / 100
-        if product.get("rating", 0) >= 4.0:
-            score += product["rating"] * 10
-        if product.get("badges"):
-            score += len(product["badges"]) * 5
-        
-        product["market_score"] = score
-        if score > 10:
-            top_products.append(product)
-    
-    top_products.sort(key=lambda x: x["market_score"], reverse=True)
-    
     return {
-        "market_leaders": top_products[:5],
-        "category_saturation": len(set([p.get("brand", "") for p in products])),
-        "price_competition": "high" if len(set([p["price"] for p in products if p["price"] > 0])) > 10 else "moderate",
-        "consumer_engagement": "high" if sum([p.get("review_count", 0) for p in products]) > 5000 else "moderate"
+        "market_leaders": top_products,
+        "category_saturation": agg.distinct_brands,
+        "price_competition": "high" if np.unique(agg.prices).size > 10 else "moderate",
+        "consumer_engagement": "high" if agg.total_reviews > 5000 else "moderate"
     }
 
 
-def generate_mobile_ads_insights(products: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
+def generate_mobile_ads_insights(agg: ProductAggregate, query: str) -> Dict[str, Any]:
     """모바일 광고 전략 인사이트"""
     
-    prices = [p["price"] for p in products if p["price"] > 0]
-    avg_price = sum(prices) / len(prices) if prices else 0
+    prices = agg.prices
+    avg_price = float(prices.mean()) if prices.size else 0
     _ = query  # Store category name for targeting insights
     
     return {
         "target_audience_insights": {
             "price_sensitivity": "high" if avg_price < 100000 else "low",
-            "brand_loyalty": "high" if len(set([p.get("brand") for p in products])) < 5 else "moderate",
-            "research_driven": "high" if sum([p.get("review_count", 0) for p in products]) > 10000 else "moderate"
+            "brand_loyalty": "high" if agg.distinct_brands < 5 else "moderate",
+            "research_driven": "high" if agg.total_reviews > 10000 else "moderate"
         },
         "ad_targeting_recommendations": {
             "budget_segments": {
-                "low_budget": f"Under {min(prices):,}원" if prices else "N/A",
-                "mid_budget": f"{int(avg_price*0.8):,}원 - {int(avg_price*1.2):,}원" if prices else "N/A", 
-                "high_budget": f"Over {max(prices):,}원" if prices else "N/A"
+                "low_budget": f"Under {int(prices.min()):,}원" if prices.size else "N/A",
+                "mid_budget": f"{int(avg_price*0.8):,}원 - {int(avg_price*1.2):,}원" if prices.size else "N/A", 
+                "high_budget": f"Over {int(prices.max()):,}원" if prices.size else "N/A"
             },
             "key_selling_points": [
-                "Price competitiveness" if len([p for p in products if p.get("discount_rate", 0) > 10]) > 5 else None,
-                "Brand reputation" if any("브랜드" in str(p.get("badges", [])) for p in products) else None,
-                "Customer satisfaction" if sum([p.get("rating", 0) for p in products]) / len(products) > 4.0 else None
+                "Price competitiveness" if agg.deep_discount_count > 5 else None,
+                "Brand reputation" if agg.has_brand_badge else None,
+                "Customer satisfaction" if agg.total_rating / agg.count > 4.0 else None
             ]
         },
         "campaign_timing": {
-            "competition_level": "high" if len(products) > 30 else "moderate",
-            "market_opportunity": "good" if avg_price > 50000 and len(products) < 50 else "competitive"
+            "competition_level": "high" if agg.count > 30 else "moderate",
+            "market_opportunity": "good" if avg_price > 50000 and agg.count < 50 else "competitive"
         }
     }
 
@@ -591,7 +789,10 @@ async def main():
     print("Perfect for understanding Korean consumer behavior!")
     print()
     
-    result = await analyze_ssg_purchase_behavior(query, max_products=20, include_reviews=False)
+    try:
+        result = await analyze_ssg_purchase_behavior(query, max_products=20, include_reviews=False)
+    finally:
+        await aclose_pool()
     
     if "error" not in result:
         print("\n📊 KEY INSIGHTS:")
@@ -1,170 +1,229 @@
 # ssg_scrape.py
 #!/usr/bin/env python3
 import asyncio
-import json
+import orjson
 import argparse
 import contextlib
-from typing import List, Dict, Any
+import re
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import List, Dict, Any, Optional
 from playwright.async_api import async_playwright
+from ssg_blocklist import block_heavy_resources
+
+# 정적 HTML fast path (없으면 항상 Playwright 사용)
+try:
+  import httpx
+  HAS_HTTPX = True
+except ImportError:
+  HAS_HTTPX = False
+
+try:
+  from selectolax.lexbor import LexborHTMLParser
+  HAS_SELECTOLAX = True
+except ImportError:
+  HAS_SELECTOLAX = False
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/120.0.0.0 Safari/537.36")
+
+# --- 추출 셀렉터 (JS와 selectolax 포트가 공유; JS에는 %NAME% 자리에 그대로 주입됨) ---
+# 카드 후보 래퍼 (우선순위 순)
+CARD_WRAPS = [
+  "li.srchItem","li.cunit_prod","li","article",
+  ".cunit","[class*='cunit_']",
+  ".chakra-card",".chakra-stack",".chakra-link",
+  "div[class*='grid']","div[class*='stack']","div[class*='card']",
+  "[data-product]","[data-item]"
+]
+TITLE_SELS = [
+  "a[title]","img[alt]",
+  ".cm_item_tit",".cunit_info_tit",".cunit_tit",
+  "p[class*='chakra-text'] span, p[class*='chakra-text']",
+  "h1,h2,h3,h4,h5,h6",
+  "[class*='title']","[class*='tit']","[class*='name']"
+]
+BRAND_SELS = [
+  ".cm_mall_text",".mallname",".brand",".cunit_info .mall",".cunit_info .brand",
+  ".cm_mall",".mall"
+]
+RATING_SELS = [
+  "[aria-label*='평점']","[class*='rating']","[class*='rate']","[class*='star']","[class*='score']"
+]
+REVIEW_SELS = [
+  # 사용자 제보 경로: chakra-stack 내 p:nth-child(4) > span 등
+  ".chakra-stack p span",
+  "[class*='review']","[class*='rcount']","[class*='cnt']"
+]
+PRICE_SELS = [
+  "em[class*='price']","span[class*='price']","strong[class*='price']",
+  ".ssg_price",".org_price",".opt_price",".final_price",".sale_price",
+  "[data-price]","em.css-1oiygnj",".css-idkz9h",".css-ffjhre"
+]
+PRICE_LABELS = ["판매가격","즉시할인가","쿠폰","혜택가","최저가","가격"]
+# 추적성 파라미터 (나머지, 특히 itemId는 유지)
+TRACKING_PARAMS = ["NaPm","ckwhere","src_area","srcid","_gd","tr","gd_type"]
+# 상품 앵커 (두 레이아웃을 한 셀렉터로)
+ANCHOR_SEL = "a[href*='itemView.ssg'], a.chakra-link[href*='/item/']"
 
 # --- 핵심 JS: SSG 검색 카드에서 title / price / brand / rating / review / url / image 추출 ---
 JS = r"""
 (() => {
   const MAX = %MAX%;
 
-  const q  = (el, sel) => el.querySelector(sel);
+  // 카드/라벨마다 쓰는 정규식은 한 번만 만들어 재사용
+  const RE_WS = /\s/g;
+  const RE_NUM = /\d[\d,\.]+/;
+  const RE_COMMA = /,/g;
+  const RE_PRICE_ALL = /\d[\d,\.]+(?=\s*원?)/g;
+  const RE_CNT = /(\d[\d,\.]*)\s*건/;
+  const RE_PAREN = /\(([^)]+)\)/;
+  const RE_TITLE_SPLIT = /\s|,|-/;
+  const RE_ITEMID = /[?&]itemId=([^&#]+)/;
+
   const qq = (el, sel) => Array.from(el.querySelectorAll(sel));
   const txt = el => el ? el.textContent.trim() : "";
 
   const num = s => {
     if (!s) return null;
-    const m = s.replace(/\s/g,"").match(/\d[\d,\.]+/);
+    const m = s.replace(RE_WS,"").match(RE_NUM);
     if (!m) return null;
-    const v = parseFloat(m[0].replace(/,/g,""));
+    const v = parseFloat(m[0].replace(RE_COMMA,""));
     return Number.isFinite(v) ? v : null;
   };
 
 
+const DROP = new Set(%TRACKING_PARAMS%);
+
 const canon = (u) => {
+  if (!u) return "";
+  // ssg.com이 아니면 URL 파서 없이 fragment만 제거 (a.href는 이미 절대 URL)
+  if (!u.includes("ssg.com")) {
+    const h = u.indexOf("#");
+    return h < 0 ? u : u.slice(0, h);
+  }
   try {
-    if (!u) return "";
     const x = new URL(u, location.href);
     x.hash = "";
-
     if (x.hostname.endsWith("ssg.com")) {
-      // 추적성 파라미터만 제거하고, 나머지는 유지 (특히 itemId 유지)
-      const drop = ["NaPm","ckwhere","src_area","srcid","_gd","tr","gd_type"];
-      drop.forEach(k => x.searchParams.delete(k));
-
-      // 안전장치: itemId가 없으면 파라미터를 아예 건드리지 않음
-      if (!x.searchParams.has("itemId")) {
-        return x.href; // 그대로
+      for (const k of Array.from(x.searchParams.keys())) {
+        if (DROP.has(k)) x.searchParams.delete(k);
       }
     }
-
     return x.href;
   } catch (_) {
-    return u || "";
+    return u;
   }
 };
 
-  // 카드 후보 래퍼 & 타이틀/브랜드 셀렉터
-  const CARD_WRAPS = [
-    "li.srchItem","li.cunit_prod","li","article",
-    ".cunit","[class*='cunit_']",
-    ".chakra-card",".chakra-stack",".chakra-link",
-    "div[class*='grid']","div[class*='stack']","div[class*='card']",
-    "[data-product]","[data-item]"
-  ];
-  const TITLE_SELS = [
-    "a[title]","img[alt]",
-    ".cm_item_tit",".cunit_info_tit",".cunit_tit",
-    "p[class*='chakra-text'] span, p[class*='chakra-text']",
-    "h1,h2,h3,h4,h5,h6",
-    "[class*='title']","[class*='tit']","[class*='name']"
-  ];
-  const BRAND_SELS = [
-    ".cm_mall_text",".mallname",".brand",".cunit_info .mall",".cunit_info .brand",
-    ".cm_mall",".mall"
-  ];
-  const RATING_SELS = [
-    "[aria-label*='평점']","[class*='rating']","[class*='rate']","[class*='star']","[class*='score']"
-  ];
-  const REVIEW_SELS = [
-    // 사용자 제보 경로: chakra-stack 내 p:nth-child(4) > span 등
-    ".chakra-stack p span",
-    "[class*='review']","[class*='rcount']","[class*='cnt']"
-  ];
+  // 카드 후보 래퍼 & 필드 셀렉터 (Python 상수에서 주입)
+  const CARD_WRAPS = %CARD_WRAPS%;
+  const TITLE_SELS = %TITLE_SELS%;
+  const BRAND_SELS = %BRAND_SELS%;
+  const RATING_SELS = %RATING_SELS%;
+  const REVIEW_SELS = %REVIEW_SELS%;
+  // 카드마다 셀렉터 N번 대신 합친 셀렉터로 한 번만 훑음
+  const TITLE_SEL  = TITLE_SELS.join(",");
+  const BRAND_SEL  = BRAND_SELS.join(",");
+  const RATING_SEL = RATING_SELS.join(",");
+  const REVIEW_SEL = REVIEW_SELS.join(",");
+
+  // 셀렉터별 첫 매치 노드의 텍스트 중 우선순위(인덱스)가 가장 낮은 비어있지 않은 값
+  // (셀렉터를 하나씩 q()하던 것과 같은 결과를 querySelectorAll 한 번으로)
+  const pickBySel = (root, sels, joined) => {
+    const texts = new Array(sels.length);
+    for (const el of root.querySelectorAll(joined)) {
+      for (let i = 0; i < sels.length; i++) {
+        if (texts[i] === undefined && el.matches(sels[i])) texts[i] = txt(el);
+      }
+      if (texts[0]) break;
+    }
+    for (const t of texts) if (t) return t;
+    return "";
+  };
 
   // ★ 라벨 기반 가격 추출기
+  const LABELS = %PRICE_LABELS%;
+  const PRICE_SELS = %PRICE_SELS%;
+  const PRICE_SEL = PRICE_SELS.join(",");
+
 const pickPrice = (root) => {
-  const LABELS = ["판매가격","즉시할인가","쿠폰","혜택가","최저가","가격"];
-  const PRICE_SELS = [
-    "em[class*='price']","span[class*='price']","strong[class*='price']",
-    ".ssg_price",".org_price",".opt_price",".final_price",".sale_price",
-    "[data-price]","em.css-1oiygnj",".css-idkz9h",".css-ffjhre"
-  ];
   const cleanNum = (s) => {
     if (!s) return null;
-    const m = s.replace(/\s/g,"").match(/\d[\d,\.]+/);
+    const m = s.replace(RE_WS,"").match(RE_NUM);
     if (!m) return null;
-    const v = parseFloat(m[0].replace(/,/g,""));
+    const v = parseFloat(m[0].replace(RE_COMMA,""));
     return Number.isFinite(v) && v > 500 ? v : null;
   };
 
-  // (0) "판매가격" 라벨을 포함하는 컨테이너에서, 라벨 텍스트 제거 후 남은 숫자
-  const labelNodes = Array.from(root.querySelectorAll("em,span,div,strong,b"))
-    .filter(n => LABELS.some(k => (n.textContent||"").includes(k)));
-  for (const lab of labelNodes) {
-    const cont = lab.closest("em,span,div,strong,b") || lab.parentElement;
-    if (cont) {
-      const contText = (cont.textContent||"").replace(/\s/g,"");
-      const labelText = (lab.textContent||"").replace(/\s/g,"");
-      const after = contText.replace(labelText, "");
-      const v0 = cleanNum(after);
-      if (v0 !== null) return v0;
-    }
-  }
-
-  // (1) 라벨 다음 **텍스트노드/형제 요소들**을 걸어가며 숫자 찾기
-  for (const lab of labelNodes) {
-    let node = lab.nextSibling;
-    let hops = 0;
-    while (node && hops < 8) {
-      if (node.nodeType === Node.TEXT_NODE) {
-        const v1 = cleanNum(node.textContent || "");
-        if (v1 !== null) return v1;
-      } else if (node.nodeType === Node.ELEMENT_NODE) {
-        const v2 = cleanNum(node.textContent || "");
-        if (v2 !== null) return v2;
-        for (const el of node.querySelectorAll("span,em,strong,b,[class*='price']")) {
-          const v3 = cleanNum(el.textContent || "");
-          if (v3 !== null) return v3;
+  // 카드의 텍스트 노드를 한 번만 훑으며
+  //  (1) 라벨 텍스트 노드(또는 그 뒤 8개 이내)의 첫 숫자 → 즉시 반환
+  //  (2) 가격 클래스 요소 안의 첫 숫자 (PRICE_SELS 우선순위가 가장 높은 것; 할인 전 가격보다 판매가 우선)
+  //  (3) 전체에서 '원' 앞의 가장 큰 숫자
+  // 순으로 우선순위를 매김
+  const byClass = new Array(PRICE_SELS.length).fill(null);
+  let max = null, labelHops = 0;
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+  for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+    const t = node.nodeValue || "";
+    if (!t.trim()) continue;
+
+    const lab = LABELS.find(k => t.includes(k));
+    if (lab) labelHops = 8;
+    const v = cleanNum(lab ? t.replace(lab, "") : t);
+    if (v !== null) {
+      if (labelHops > 0) return v;
+      const hit = node.parentElement && node.parentElement.closest(PRICE_SEL);
+      if (hit && root.contains(hit)) {
+        // 카드 root까지의 조상 중 각 셀렉터에 처음 걸린 값을 인덱스별로 기록
+        for (let el = node.parentElement; el; el = el === root ? null : el.parentElement) {
+          for (let i = 0; i < PRICE_SELS.length; i++) {
+            if (byClass[i] === null && el.matches(PRICE_SELS[i])) byClass[i] = v;
+          }
         }
       }
-      node = node.nextSibling;
-      hops++;
     }
-  }
+    if (labelHops > 0) labelHops--;
 
-  // (2) 클래스 기반 백업
-  for (const s of PRICE_SELS) {
-    for (const el of root.querySelectorAll(s)) {
-      const v = cleanNum(el.textContent || "");
-      if (v !== null) return v;
+    for (const m of t.matchAll(RE_PRICE_ALL)) {
+      const n = parseFloat(m[0].replace(RE_COMMA,""));
+      if (Number.isFinite(n) && n > 500 && (max === null || n > max)) max = n;
     }
   }
-
-  // (3) 최종 백업: 카드 전체 텍스트에서 '원' 앞의 가장 큰 숫자
-  const all = root.textContent || "";
-  const nums = Array.from(all.matchAll(/\d[\d,\.]+(?=\s*원?)/g))
-    .map(m => parseFloat(m[0].replace(/,/g,"")))
-    .filter(v => Number.isFinite(v) && v > 500)
-    .sort((a,b)=>b-a);
-  return nums[0] || null;
+  for (const v of byClass) if (v !== null) return v;
+  return max;
 };
 
+  // CARD_WRAPS 우선순위대로 앵커에서 closest() 한 번씩 (li 계열이 썸네일 div보다 먼저)
   const getRoot = (a) => {
-    let el = a;
-    for (let i=0; i<7 && el; i++) {
-      for (const sel of CARD_WRAPS) {
-        const wrap = el.closest(sel);
-        if (wrap && (wrap.querySelector("a[href]") || wrap.querySelector("img[src]"))) return wrap;
-      }
-      el = el.parentElement;
+    for (const sel of CARD_WRAPS) {
+      const wrap = a.closest(sel);
+      if (wrap && wrap.querySelector("a[href],img[src]")) return wrap;
     }
     return a;
   };
 
-  // 앵커 수집
-  let anchors = Array.from(document.querySelectorAll("a[href*='itemView.ssg']"));
-  if (!anchors.length) anchors = Array.from(document.querySelectorAll("a.chakra-link[href*='/item/']"));
+  // 앵커: NodeList를 바로 순회하다 MAX에서 중단
+  const ANCHOR_SEL = %ANCHOR_SEL%;
 
-  const out = [];
+  // 행 객체 배열 대신 컬럼별 배열로 반환 (CDP 페이로드에서 키 반복 제거)
+  const COLS = ["title","url","image","price","brand","rating_text","review_text","rating","review_count"];
+  const cols = Object.fromEntries(COLS.map(k => [k, []]));
+  let count = 0;
   const seen = new Set();
 
-  for (const a of anchors) {
-    if (out.length >= MAX) break;
+  for (const a of document.querySelectorAll(ANCHOR_SEL)) {
+    if (count >= MAX) break;
+
+    // dedup: URL 기반 키는 a.href만으로 계산되므로 카드 추출 전에 중복을 거름
+    const url = canon(a.href);
+    const idm = RE_ITEMID.exec(url);
+    let key = idm ? "id:" + idm[1] : (url ? "u:" + url : "");
+    if (key) {
+      if (seen.has(key)) continue;
+      seen.add(key);
+    }
+
     const root = getRoot(a);
 
     // title
@@ -174,11 +233,9 @@ const pickPrice = (root) => {
       title = (imgAlt && imgAlt.getAttribute("alt")) || "";
     }
     if (!title) {
-      for (const s of TITLE_SELS) { const t = txt(q(root, s)); if (t) { title = t; break; } }
-      if (!title) title = txt(a);
+      title = pickBySel(root, TITLE_SELS, TITLE_SEL) || txt(a);
     }
 
-    const url   = canon(a.href);
     const image = (root.querySelector("img[currentSrc], img[src], img[data-src], img[data-original]")?.currentSrc)
                || (root.querySelector("img[src]")?.src)
                || root.querySelector("img[data-src]")?.getAttribute("data-src")
@@ -187,22 +244,18 @@ const pickPrice = (root) => {
 
     const price = pickPrice(root);
 
-    let brand = "";
-    for (const s of BRAND_SELS) { const t = txt(q(root, s)); if (t) { brand = t; break; } }
+    let brand = pickBySel(root, BRAND_SELS, BRAND_SEL);
     if (!brand && title) {
-      const paren = title.match(/\(([^)]+)\)/);
-      brand = paren ? paren[1].trim() : (title.split(/\s|,|-/)[0] || "").trim();
+      const paren = title.match(RE_PAREN);
+      brand = paren ? paren[1].trim() : (title.split(RE_TITLE_SPLIT)[0] || "").trim();
     }
     if (!brand) brand = null;
 
-    const rating_text = (() => {
-      for (const s of RATING_SELS) { const t = txt(q(root, s)); if (t) return t; }
-      return null;
-    })();
+    const rating_text = pickBySel(root, RATING_SELS, RATING_SEL) || null;
     const review_text = (() => {
       // 카드 내부 여러 span 중 “리뷰/건/평” 같은 힌트 포함 텍스트를 우선
-      const spans = qq(root, REVIEW_SELS.join(","));
-      const cand = spans.map(el => txt(el)).find(t => /리뷰|건|평/.test(t));
+      const spans = qq(root, REVIEW_SEL);
+      const cand = spans.map(el => txt(el)).find(t => t.includes("리뷰") || t.includes("건") || t.includes("평"));
       return cand || (spans.length ? txt(spans[0]) : null);
     })();
 
@@ -217,83 +270,409 @@ const pickPrice = (root) => {
     };
 
     if (row.review_count == null) {
-      const m = (root.textContent||"").match(/(\d[\d,\.]*)\s*건/);
-      if (m) row.review_count = parseInt(m[1].replace(/,/g,''), 10);
+      const m = (root.textContent||"").match(RE_CNT);
+      if (m) row.review_count = parseInt(m[1].replace(RE_COMMA,""), 10);
     }
 
     const rnum = num(row.rating_text); if (rnum !== null) row.rating = rnum;
     const cnum = num(row.review_text); if (cnum !== null) row.review_count = cnum;
 
-    // dedup
-    let key = "";
-    if (row.url && row.url.includes("itemId=")) key = "id:" + row.url.split("itemId=")[1].split("&")[0];
-    else if (row.url) key = "u:" + row.url;
-    else key = "t:" + (row.title||"") + "|i:" + (row.image||"");
-    if (!seen.has(key)) { seen.add(key); out.push(row); }
+    // URL이 없을 때만 추출 결과(title/image)로 dedup
+    if (!key) {
+      key = "t:" + (row.title||"") + "|i:" + (row.image||"");
+      if (seen.has(key)) continue;
+      seen.add(key);
+    }
+    for (const k of COLS) cols[k].push(row[k] ?? null);
+    count++;
   }
 
-  return out.slice(0, MAX);
+  return cols;
 })();
 
+"""
+for _name, _value in {"CARD_WRAPS": CARD_WRAPS, "TITLE_SELS": TITLE_SELS, "BRAND_SELS": BRAND_SELS,
+                      "RATING_SELS": RATING_SELS, "REVIEW_SELS": REVIEW_SELS, "PRICE_SELS": PRICE_SELS,
+                      "PRICE_LABELS": PRICE_LABELS, "TRACKING_PARAMS": TRACKING_PARAMS,
+                      "ANCHOR_SEL": ANCHOR_SEL}.items():
+  JS = JS.replace(f"%{_name}%", orjson.dumps(_value).decode())
+
+def rows_from_columns(cols: Dict[str, list]) -> List[Dict[str, Any]]:
+  """JS가 돌려준 컬럼별 배열 → 행 dict 리스트 (pd.DataFrame(cols)로 바로 써도 됨)"""
+  keys = list(cols)
+  return [dict(zip(keys, vals)) for vals in zip(*cols.values())]
+
+
+# 페이지 내 스크롤 드라이버: 앵커(고유 href)가 max에 닿거나 두 라운드 연속 그대로면 종료.
+# 라운드마다 새 앵커가 DOM에 붙는 순간(MutationObserver) 깨어나고, 없으면 400ms 후 다음 라운드
+_SCROLL_DRIVER_JS = """
+async ([sel, max]) => {
+  const count = () => new Set(Array.from(document.querySelectorAll(sel), a => a.href)).size;
+  let prev = count(), stable = 0;
+  for (let i = 0; i < 15 && prev < max && stable < 2; i++) {
+    const before = document.querySelectorAll(sel).length;
+    window.scrollBy(0, document.body.scrollHeight);
+    await new Promise(resolve => {
+      const done = () => { obs.disconnect(); clearTimeout(timer); resolve(); };
+      const obs = new MutationObserver(() => {
+        if (document.querySelectorAll(sel).length > before) done();
+      });
+      const timer = setTimeout(done, 400);
+      obs.observe(document.body, {childList: true, subtree: true});
+    });
+    const n = count();
+    stable = n === prev ? stable + 1 : 0;
+    prev = n;
+  }
+  return prev;
+}
 """
 
-async def scrape(url: str, max_items: int = 60, headless: bool = True) -> List[Dict[str, Any]]:
-  async with async_playwright() as pw:
-    browser = await pw.chromium.launch(
-      headless=headless,
-      args=["--disable-blink-features=AutomationControlled"]
-    )
-    ctx = await browser.new_context(
-      user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                  "AppleWebKit/537.36 (KHTML, like Gecko) "
-                  "Chrome/120.0.0.0 Safari/537.36"),
-      locale="ko-KR",
-      timezone_id="Asia/Seoul",
-      viewport={"width": 1366, "height": 900}
-    )
+class BrowserPool:
+  """Chromium/컨텍스트를 한 번만 띄우고 URL마다 새 페이지로 스크랩 (cold start 1회)"""
+
+  def __init__(self, headless: bool = True, block_resources: bool = True, cdp_endpoint: Optional[str] = None):
+    self.headless = headless
+    self.block_resources = block_resources
+    # 상시 실행 중인 Chromium(--remote-debugging-port / browserless)에 붙을 때의 주소
+    self.cdp_endpoint = cdp_endpoint
+    self._pw = None
+    self._browser = None
+    self._ctx = None
+
+  async def __aenter__(self):
+    self._pw = await async_playwright().start()
+    if self.cdp_endpoint:
+      self._browser = await self._pw.chromium.connect_over_cdp(self.cdp_endpoint)
+    else:
+      self._browser = await self._pw.chromium.launch(
+        headless=self.headless,
+        args=["--disable-blink-features=AutomationControlled"]
+      )
+    if self.cdp_endpoint and self._browser.contexts:
+      # 원격 브라우저의 기본 컨텍스트(캐시/쿠키가 데워진 프로필)를 그대로 사용
+      self._ctx = self._browser.contexts[0]
+    else:
+      self._ctx = await self._browser.new_context(
+        user_agent=USER_AGENT,
+        locale="ko-KR",
+        timezone_id="Asia/Seoul",
+        viewport={"width": 1366, "height": 900}
+      )
     # anti-bot 1단계
-    await ctx.add_init_script("Object.defineProperty(navigator,'webdriver',{get:()=>undefined});")
-
-    page = await ctx.new_page()
-    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-
-    # lazy-load 유도 + anchor 등장 대기
-    for _ in range(10):
-      await page.evaluate("window.scrollBy(0, document.body.scrollHeight*0.6);")
-      await asyncio.sleep(2)
-    with contextlib.suppress(Exception):
-      await page.wait_for_selector("a[href*='itemView.ssg'], a.chakra-link[href*='/item/']", timeout=8000)
-
-    items = await page.evaluate(JS.replace("%MAX%", str(max_items)))
-
-    # 디버그 아티팩트
-    with contextlib.suppress(Exception):
-      await page.screenshot(path="ssg_debug.png", full_page=True)
-    with contextlib.suppress(Exception):
-      html = await page.content()
-      with open("ssg_debug.html", "w", encoding="utf-8") as f:
-        f.write(html)
-
-    await browser.close()
-    return items
-      
+    await self._ctx.add_init_script("Object.defineProperty(navigator,'webdriver',{get:()=>undefined});")
+    if self.block_resources:
+      await self._ctx.route("**/*", block_heavy_resources)
+    return self
+
+  async def __aexit__(self, *exc_info):
+    # CDP로 연결한 경우 close()는 연결만 끊고 원격 브라우저/기본 컨텍스트는 유지됨
+    if self._browser:
+      await self._browser.close()
+      self._browser = None
+    if self._pw:
+      await self._pw.stop()
+      self._pw = None
+
+  async def scrape(self, url: str, max_items: int = 60, debug: bool = False) -> List[Dict[str, Any]]:
+    page = await self._ctx.new_page()
+    try:
+      await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+
+      # lazy-load 유도: 스크롤 루프를 페이지 안에서 돌려 라운드마다 CDP 왕복 없음
+      await page.evaluate(_SCROLL_DRIVER_JS, [ANCHOR_SEL, max_items])
+      with contextlib.suppress(Exception):
+        await page.wait_for_selector(ANCHOR_SEL, timeout=8000)
+
+      items = rows_from_columns(await page.evaluate(JS.replace("%MAX%", str(max_items))))
+
+      # 디버그 아티팩트 (full-page 스크린샷은 레이아웃+래스터 비용이 커서 --debug 때만)
+      if debug:
+        with contextlib.suppress(Exception):
+          await page.screenshot(path="ssg_debug.png", full_page=True)
+        with contextlib.suppress(Exception):
+          html = await page.content()
+          with open("ssg_debug.html", "w", encoding="utf-8") as f:
+            f.write(html)
+
+      return items
+    finally:
+      await page.close()
+
+
+async def scrape(url: str, max_items: int = 60, headless: bool = True,
+                 cdp_endpoint: Optional[str] = None, debug: bool = False) -> List[Dict[str, Any]]:
+  async with BrowserPool(headless=headless, cdp_endpoint=cdp_endpoint) as bp:
+    return await bp.scrape(url, max_items=max_items, debug=debug)
+
+
+async def scrape_many(urls: List[str], max_items: int = 60, headless: bool = True,
+                      concurrency: int = 5, cdp_endpoint: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+  """여러 URL을 브라우저 하나로 동시에 스크랩 (결과는 urls 순서)"""
+  sem = asyncio.Semaphore(concurrency)
+
+  async with BrowserPool(headless=headless, cdp_endpoint=cdp_endpoint) as bp:
+    async def _bounded(u):
+      async with sem:
+        return await bp.scrape(u, max_items=max_items)
+
+    return await asyncio.gather(*[_bounded(u) for u in urls])
+
+
+def _with_page(url: str, page: int) -> str:
+  """검색 URL의 page 파라미터를 교체/추가"""
+  parts = urlsplit(url)
+  query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "page"]
+  query.append(("page", str(page)))
+  return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+async def scrape_paginated(base_url: str, pages=range(1, 6), max_items: int = 60, headless: bool = True,
+                           concurrency: int = 5, cdp_endpoint: Optional[str] = None) -> List[Dict[str, Any]]:
+  """검색 결과 여러 페이지를 한 컨텍스트에서 동시에 스크랩하고 itemId 기준으로 합침 (페이지 순서 유지)"""
+  per_page = await scrape_many([_with_page(base_url, p) for p in pages], max_items=max_items,
+                               headless=headless, concurrency=concurrency, cdp_endpoint=cdp_endpoint)
+
+  out, seen = [], set()
+  for rows in per_page:
+    for r in rows:
+      url = r.get("url") or ""
+      idm = _RE_ITEMID.search(url)
+      key = idm.group(1) if idm else url
+      if key:
+        if key in seen:
+          continue
+        seen.add(key)
+      out.append(r)
+  return out
+
+
+# --- HTTP fast path: JS 추출 로직의 Python(selectolax) 포트 (셀렉터는 위 공용 상수 사용) ---
+_PRICE_SEL = ",".join(PRICE_SELS)
+_REVIEW_SEL = ",".join(REVIEW_SELS)
+_TRACKING_PARAMS = frozenset(TRACKING_PARAMS)
+
+_RE_WS = re.compile(r"\s")
+_RE_NUM = re.compile(r"\d[\d,\.]+")
+_RE_PRICE_ALL = re.compile(r"\d[\d,\.]+(?=\s*원?)")
+_RE_CNT = re.compile(r"(\d[\d,\.]*)\s*건")
+_RE_PAREN = re.compile(r"\(([^)]+)\)")
+_RE_TITLE_SPLIT = re.compile(r"\s|,|-")
+_RE_ITEMID = re.compile(r"[?&]itemId=([^&#]+)")
+
+# 정적 HTML에서 이 비율 미만으로 잡히면 lazy-load 페이지로 보고 브라우저로 재시도
+HTTP_MIN_RATIO = 0.5
+
+
+def _canon(href: str, base: str) -> str:
+  """JS canon()과 동일: fragment 제거, ssg.com URL은 추적 파라미터 제거"""
+  if not href:
+    return ""
+  parts = urlsplit(urljoin(base, href))._replace(fragment="")
+  if (parts.hostname or "").endswith("ssg.com"):
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    parts = parts._replace(query=urlencode([(k, v) for k, v in query if k not in _TRACKING_PARAMS]))
+  return urlunsplit(parts)
+
+
+def _num(text: Optional[str], min_value: float = None) -> Optional[float]:
+  if not text:
+    return None
+  m = _RE_NUM.search(_RE_WS.sub("", text))
+  if not m:
+    return None
+  try:
+    v = float(m.group().replace(",", ""))
+  except ValueError:
+    return None
+  return v if min_value is None or v > min_value else None
+
+
+def _query(root, selector: str):
+  """JS querySelector(): 자기 자신은 제외한 첫 하위 매치 (selectolax css는 자신도 포함)"""
+  for node in root.css(selector):
+    if node != root:
+      return node
+  return None
+
+
+def _matches(node, selector: str) -> bool:
+  """JS matches(): 노드 자신이 셀렉터에 맞는지 (css_matches는 하위 노드까지 봄)"""
+  return node.css_first(selector) == node
+
+
+def _closest(node, selector: str, stop=None):
+  """JS closest(): 자신부터 위로 올라가며 첫 매치 (stop 노드까지만, document 노드 전에서 멈춤)"""
+  while node is not None and not node.tag.startswith("-"):
+    if _matches(node, selector):
+      return node
+    if stop is not None and node == stop:
+      break
+    node = node.parent
+  return None
+
+
+def _pick_by_sel(root, selectors: List[str]) -> str:
+  """JS pickBySel(): 셀렉터 우선순위대로 각 셀렉터의 첫 매치 텍스트 중 비어있지 않은 첫 값"""
+  for selector in selectors:
+    node = _query(root, selector)
+    t = node.text().strip() if node is not None else ""
+    if t:
+      return t
+  return ""
+
+
+def _card_root(a):
+  """JS getRoot(): CARD_WRAPS 우선순위대로 a/img를 가진 래퍼"""
+  for selector in CARD_WRAPS:
+    wrap = _closest(a, selector)
+    if wrap is not None and _query(wrap, "a[href],img[src]") is not None:
+      return wrap
+  return a
+
+
+def _pick_price(root) -> Optional[float]:
+  """JS pickPrice(): 라벨 뒤 첫 숫자 → 우선순위가 가장 높은 가격 클래스 안 첫 숫자 → 가장 큰 숫자"""
+  by_class = [None] * len(PRICE_SELS)
+  best, label_hops = None, 0
+  for node in root.traverse(include_text=True):
+    if node.tag != "-text":
+      continue
+    t = node.text_content or ""
+    if not t.strip():
+      continue
+
+    lab = next((k for k in PRICE_LABELS if k in t), None)
+    if lab:
+      label_hops = 8
+    v = _num(t.replace(lab, "", 1) if lab else t, min_value=500)
+    if v is not None:
+      if label_hops > 0:
+        return v
+      if _closest(node.parent, _PRICE_SEL, stop=root) is not None:
+        # 카드 root까지의 조상 중 각 셀렉터에 처음 걸린 값을 인덱스별로 기록
+        el = node.parent
+        while el is not None:
+          for i, selector in enumerate(PRICE_SELS):
+            if by_class[i] is None and _matches(el, selector):
+              by_class[i] = v
+          el = None if el == root else el.parent
+    if label_hops > 0:
+      label_hops -= 1
+
+    for m in _RE_PRICE_ALL.finditer(t):
+      n = float(m.group().replace(",", ""))
+      if n > 500 and (best is None or n > best):
+        best = n
+  return next((v for v in by_class if v is not None), best)
+
+
+def parse_search_page(html: str, base_url: str, max_items: int = 60) -> List[Dict[str, Any]]:
+  """정적 검색 HTML → scrape()와 같은 형태의 행 리스트"""
+  tree = LexborHTMLParser(html)
+  out = []
+  seen = set()
+
+  for a in tree.css(ANCHOR_SEL):
+    if len(out) >= max_items:
+      break
+
+    url = _canon(a.attributes.get("href") or "", base_url)
+    idm = _RE_ITEMID.search(url)
+    key = "id:" + idm.group(1) if idm else ("u:" + url if url else "")
+    if key:
+      if key in seen:
+        continue
+      seen.add(key)
+
+    root = _card_root(a)
+
+    title = a.attributes.get("title") or a.attributes.get("aria-label") or ""
+    if not title:
+      img_alt = _query(root, "img[alt]") or _query(a, "img[alt]")
+      title = (img_alt.attributes.get("alt") if img_alt else "") or ""
+    if not title:
+      title = _pick_by_sel(root, TITLE_SELS) or a.text().strip()
+
+    img = root.css_first("img[src]")
+    image = urljoin(base_url, img.attributes["src"]) if img is not None and img.attributes.get("src") else None
+    if image is None:
+      for attr in ("data-src", "data-original"):
+        lazy = root.css_first(f"img[{attr}]")
+        if lazy is not None and lazy.attributes.get(attr):
+          image = lazy.attributes[attr]
+          break
+
+    brand = _pick_by_sel(root, BRAND_SELS)
+    if not brand and title:
+      paren = _RE_PAREN.search(title)
+      brand = paren.group(1).strip() if paren else (_RE_TITLE_SPLIT.split(title)[0] or "").strip()
+
+    rating_text = _pick_by_sel(root, RATING_SELS) or None
+    spans = [n.text().strip() for n in root.css(_REVIEW_SEL) if n != root]
+    review_text = next((t for t in spans if "리뷰" in t or "건" in t or "평" in t), None) or (spans[0] if spans else None)
+
+    review_count = None
+    m = _RE_CNT.search(root.text())
+    if m:
+      review_count = int(float(m.group(1).replace(",", "")))
+    cnum = _num(review_text)
+    if cnum is not None:
+      review_count = cnum
+
+    row = {
+      "title": title or None,
+      "url": url,
+      "image": image,
+      "price": _pick_price(root),
+      "brand": brand or None,
+      "rating_text": rating_text,
+      "review_text": review_text or None,
+      "rating": _num(rating_text),
+      "review_count": review_count,
+    }
+
+    if not key:
+      key = "t:" + (row["title"] or "") + "|i:" + (row["image"] or "")
+      if key in seen:
+        continue
+      seen.add(key)
+    out.append(row)
+
+  return out
+
+
+async def scrape_http(url: str, max_items: int = 60, headless: bool = True,
+                      cdp_endpoint: Optional[str] = None, debug: bool = False) -> List[Dict[str, Any]]:
+  """httpx + selectolax로 먼저 시도하고, 상품이 충분히 안 잡히면 Playwright scrape()로 폴백"""
+  if HAS_HTTPX and HAS_SELECTOLAX:
+    try:
+      async with httpx.AsyncClient(follow_redirects=True, timeout=15,
+                                   headers={"User-Agent": USER_AGENT, "Accept-Language": "ko-KR,ko;q=0.9"}) as client:
+        r = await client.get(url)
+      if r.status_code == 200:
+        items = parse_search_page(r.text, str(r.url), max_items)
+        if len(items) >= max_items * HTTP_MIN_RATIO:
+          return items
+    except Exception as e:
+      print("HTTP fast path 실패:", str(e)[:60])
+
+  return await scrape(url, max_items=max_items, headless=headless, cdp_endpoint=cdp_endpoint, debug=debug)
+
 import pandas as pd
-from collections import defaultdict
 
 def analyze_by_brand(items):
-    df = pd.DataFrame(items)
-
-    brand_map = defaultdict(list)
-    for _, row in df.iterrows():
-        brand = row.get("brand") or "Unknown"
-        title = row.get("title") or "No Title"
-        brand_map[brand].append(title)
+    df = items if isinstance(items, pd.DataFrame) else pd.DataFrame(items)
+    if df.empty:
+        return {}
 
-    # 등장 횟수 + 상품명 리스트 출력용
-    analysis = {brand: {"count": len(titles), "titles": titles}
-                for brand, titles in brand_map.items()}
+    # 빈 문자열/None 모두 기본값으로 (기존 `or` 처리와 동일)
+    brands = df["brand"].mask(df["brand"].eq("")).fillna("Unknown")
+    titles = df["title"].mask(df["title"].eq("")).fillna("No Title")
 
-    return analysis
+    # 등장 횟수 + 상품명 리스트 출력용 (첫 등장 순서 유지)
+    return {brand: {"count": len(group), "titles": group.tolist()}
+            for brand, group in titles.groupby(brands, sort=False)}
 
 if __name__ == "__main__":
   ap = argparse.ArgumentParser()
@@ -301,34 +680,33 @@ if __name__ == "__main__":
   ap.add_argument("--max", type=int, default=60, help="최대 아이템 수")
   ap.add_argument("--headful", action="store_true", help="브라우저 창 띄워서 확인")
   ap.add_argument("--csv", default="", help="CSV 파일명 (예: out.csv)")
+  ap.add_argument("--jsonl", default="", help="JSONL 파일명 (예: out.jsonl)")
+  ap.add_argument("--debug", action="store_true", help="ssg_debug.png / ssg_debug.html 저장")
+  ap.add_argument("--http", action="store_true", help="httpx로 먼저 시도하고 부족하면 브라우저 사용")
+  ap.add_argument("--cdp", default=None, help="실행 중인 Chromium CDP 주소 (예: http://localhost:9222)")
   args = ap.parse_args()
 
-  items = asyncio.run(scrape(args.url, max_items=args.max, headless=not args.headful))
-  brand_analysis = analyze_by_brand(items)
+  run = scrape_http if args.http else scrape
+  items = asyncio.run(run(args.url, max_items=args.max, headless=not args.headful, cdp_endpoint=args.cdp,
+                          debug=args.debug))
+  # 분석과 CSV 저장에 같은 DataFrame을 재사용
+  df = pd.DataFrame(items, columns=["title","brand","price","rating","review_count","url","image"])
+  brand_analysis = analyze_by_brand(df)
 
   print("items:", len(items))
   for i, r in enumerate(items[:10], 1):
     print(i, r.get("title"), r.get("brand"), r.get("price"), r.get("rating"), r.get("review_count"), r.get("url"))
-  # import pandas as pd
-  # pd.DataFrame(items).to_csv('out.csv')
-
 
   for brand, info in brand_analysis.items():
     print(f"브랜드: {brand} (총 {info['count']}개)")
-  for t in info["titles"]:
-    print("  -", t)
-    
-    if args.csv:
-        import pandas as pd
-        df = pd.DataFrame(items, columns=["title","brand","price","rating","review_count","url","image"])
-        df.to_csv(args.csv, index=False, encoding="utf-8-sig")
-        print("CSV 저장:", args.csv)
-        # import csv
-        # fields = ["title","brand","price","rating","review_count","url","image"]
-        # with open(args.csv, "w", newline="", encoding="utf-8-sig") as f:
-        #     w = csv.DictWriter(f, fieldnames=fields)
-        #     w.writeheader()
-        #     for row in items:
-        #         safe_row = {k: row.get(k, "") for k in fields}
-        #         w.writerow(safe_row)
-        # print("CSV 저장:", args.csv)
+    for t in info["titles"]:
+      print("  -", t)
+
+  if args.csv:
+    df.to_csv(args.csv, index=False, encoding="utf-8-sig")
+    print("CSV 저장:", args.csv)
+
+  if args.jsonl:
+    with open(args.jsonl, "wb") as f:
+      f.writelines(orjson.dumps(r, option=orjson.OPT_APPEND_NEWLINE) for r in items)
+    print("JSONL 저장:", args.jsonl)
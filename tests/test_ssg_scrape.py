@@ -0,0 +1,31 @@
+# tests/test_ssg_scrape.py - HTTP fast path(selectolax 포트) 가격 우선순위
+import unittest
+
+import ssg_scrape
+
+SALE_CARD = """<html><body><ul>
+<li class="cunit_t232">
+  <a href="/item/itemView.ssg?itemId=1000123"><img src="https://img.ssg.com/1.jpg" alt="필립스 전기면도기"></a>
+  <div class="cunit_price"><span class="org_price">599,000원</span><em class="ssg_price">499,000</em>원</div>
+</li>
+</ul></body></html>"""
+
+
+@unittest.skipUnless(ssg_scrape.HAS_SELECTOLAX, "selectolax not installed")
+class PickPriceTest(unittest.TestCase):
+
+  def test_sale_price_beats_struck_through_price(self):
+    rows = ssg_scrape.parse_search_page(SALE_CARD, "https://www.ssg.com/search.ssg")
+    self.assertEqual(len(rows), 1)
+    self.assertEqual(rows[0]["price"], 499000)
+
+  def test_price_class_outside_card_is_ignored(self):
+    html = SALE_CARD.replace('<ul>', '<ul class="final_price">').replace(
+      '<div class="cunit_price"><span class="org_price">599,000원</span><em class="ssg_price">499,000</em>원</div>',
+      '<span class="txt">1,200</span><span class="txt">33,000원</span>')
+    rows = ssg_scrape.parse_search_page(html, "https://www.ssg.com/search.ssg")
+    self.assertEqual(rows[0]["price"], 33000)
+
+
+if __name__ == "__main__":
+  unittest.main()